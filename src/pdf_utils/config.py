@@ -10,6 +10,7 @@ MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 # Directory settings
 UPLOAD_DIR = Path("uploads")
 DB_PATH = Path("data/pdf_files.db")
+PDF_RESULT_CACHE_DIR = Path("data/pdf_cache")  # Cached TOC / page count / text extraction results
 
 # Server settings
 SERVER_PORT = 8000
@@ -19,6 +20,7 @@ ALLOWED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png', '.webp', '.ppt', '.pptx'}
 
 # LibreOffice conversion settings
 LIBREOFFICE_TIMEOUT = 60  # seconds to wait for soffice conversion
+LIBREOFFICE_PROFILE_DIR = Path("data/libreoffice_profile")  # Reused soffice user profile (skips per-run profile setup)
 
 # Image conversion settings
 DEFAULT_DPI = 150
@@ -33,6 +35,10 @@ IMAGE_COMPRESSION_QUALITY = 85  # JPEG compression quality (1-100)
 MIN_IMAGE_SIZE = 25  # Minimum width/height in pixels
 MAX_IMAGES_PER_PAGE = 25  # Maximum images to extract per page
 IMAGE_PREVIEW_SIZE = 300  # Thumbnail display size in pixels
+GALLERY_PAGES_PER_BATCH = 5  # PDF pages of extracted images rendered per lazy-load batch
+EXTRACTED_IMAGES_CACHE_SIZE = 8  # Page ranges of extracted images kept in memory for gallery/ZIP requests
+TOC_ITEMS_PER_BATCH = 50  # TOC entries rendered per lazy-load batch
+TEXT_PREVIEW_CHARS = 8192  # Characters of extracted/OCR text shown inline; full text via download/copy
 
 # OCR with LLM settings
 OCR_MODEL = "gemini-3.1-flash-lite-preview"  # Direct GenAI model
@@ -44,8 +50,13 @@ OCR_MAX_TOKENS = 4096
 # Async OCR settings
 OCR_CONCURRENT_REQUESTS = 50  # Max concurrent LLM requests
 OCR_MAX_RETRIES = 3  # Max retry attempts per page
-OCR_RETRY_DELAY_BASE = 1.0  # Base delay for exponential backoff (seconds)
+OCR_RETRY_DELAY_BASE = 1.0  # Base delay for jittered exponential backoff (seconds)
+OCR_REQUESTS_PER_MINUTE = 1000  # Token-bucket ceiling for LLM calls (0 disables)
 OCR_BATCH_TIMEOUT = 300  # Overall timeout for batch processing (seconds)
+OCR_RESULT_TTL = 300  # Seconds a finished web OCR result waits to be polled before it is dropped
+
+# Progress polling: delay before each successive status poll (last one repeats)
+UPLOAD_POLL_DELAYS = ("200ms", "500ms", "1s", "2s")
 
 # OCR Caching settings
 OCR_CACHE_RETENTION_DAYS = 60  # Keep cached OCR results for 2 months
@@ -67,4 +78,10 @@ import os as _os
 GCS_BUCKET_NAME: str = _os.getenv("GCS_BUCKET_NAME", "")
 GCS_CREDENTIALS_FILE: str | None = _os.getenv("GCS_CREDENTIALS_FILE") or None
 GCS_SIGNED_URL_EXPIRY_MINUTES: int = int(_os.getenv("GCS_SIGNED_URL_EXPIRY_MINUTES", "15"))
-GCS_DELETE_AFTER_DOWNLOAD: bool = _os.getenv("GCS_DELETE_AFTER_DOWNLOAD", "true").lower() == "true"
\ No newline at end of file
+GCS_DELETE_AFTER_DOWNLOAD: bool = _os.getenv("GCS_DELETE_AFTER_DOWNLOAD", "true").lower() == "true"
+
+# Page-level parallelism for PDF rendering/extraction (opt-in via env)
+PDF_PARALLEL_PAGES: bool = _os.getenv("PDF_PARALLEL_PAGES", "false").lower() == "true"
+PDF_PARALLEL_WORKERS: int = min(_os.cpu_count() or 1, 4)  # Worker processes
+PDF_PARALLEL_MIN_PAGES = 4  # Smaller ranges run inline to avoid IPC overhead
+PDF_DOCUMENT_CACHE_SIZE = 16  # Open PyMuPDF documents kept for reuse across requests
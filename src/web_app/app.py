@@ -1,10 +1,15 @@
 """FastHTML Web Application for PDF Utilities."""
 
 import asyncio
+import hashlib
+import logging
 import uvicorn
 from fasthtml.common import *
+from starlette.datastructures import MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
 from pdf_utils.config import UPLOAD_DIR, SERVER_PORT
 from web_app.ui.styles import CSS_STYLES
+from web_app.ui.scripts import APP_JS
 from web_app.services.cleanup import daily_cleanup
 
 # Import route setup functions
@@ -13,9 +18,58 @@ from web_app.routes import pdf as pdf_routes
 from web_app.routes import api as api_routes
 from web_app.routes import url as url_routes
 
+CSS_VERSION = hashlib.sha256(CSS_STYLES.encode()).hexdigest()[:12]
+JS_VERSION = hashlib.sha256(APP_JS.encode()).hexdigest()[:12]
+
+# Bodies that are already compressed: gzipping them only costs CPU
+_PRECOMPRESSED_TYPES = ("image/", "application/zip")
+
+
+class _TextGZipMiddleware:
+    """
+    GZipMiddleware that leaves already-compressed responses (images, ZIPs) alone.
+    
+    GZipMiddleware passes through any response that already has a
+    Content-Encoding, so precompressed responses are marked "identity" before
+    it sees them and the marker is removed again on the way out.
+    """
+    
+    def __init__(self, app, **gzip_options):
+        self.app = app
+        self.gzip = GZipMiddleware(self._mark_precompressed, **gzip_options)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        async def unmarking_send(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if headers.get("content-encoding") == "identity":
+                    del headers["content-encoding"]
+            await send(message)
+        
+        await self.gzip(scope, receive, unmarking_send)
+    
+    async def _mark_precompressed(self, scope, receive, send):
+        async def marking_send(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if ("content-encoding" not in headers
+                        and headers.get("content-type", "").startswith(_PRECOMPRESSED_TYPES)):
+                    headers["content-encoding"] = "identity"
+            await send(message)
+        
+        await self.app(scope, receive, marking_send)
+
 
 def create_app():
     """Create and configure the FastHTML application."""
+    # Route module loggers (OCR progress, cache diagnostics) to stderr;
+    # uvicorn only configures its own loggers
+    logging.basicConfig(level=logging.INFO)
+    
     # Create upload directory if it doesn't exist
     UPLOAD_DIR.mkdir(exist_ok=True)
     
@@ -25,10 +79,37 @@ def create_app():
         hdrs=(
             Link(rel='stylesheet', href='https://cdn.jsdelivr.net/npm/normalize.css@8.0.1/normalize.min.css'),
             Script(src="https://unpkg.com/htmx.org@2.0.0"),
-            Style(CSS_STYLES)
+            # Served from a content-versioned URL so browsers cache it indefinitely
+            Link(rel='stylesheet', href=f'/styles/{CSS_VERSION}'),
+            Script(src=f'/scripts/{JS_VERSION}', defer=True),
         )
     )
     
+    @rt('/styles/{version}')
+    def styles(version: str):
+        # Only the current URL may be cached as immutable
+        if version != CSS_VERSION:
+            return Response("Not found.", status_code=404)
+        return Response(
+            CSS_STYLES,
+            media_type='text/css',
+            headers={'Cache-Control': 'public, max-age=31536000, immutable'},
+        )
+    
+    @rt('/scripts/{version}')
+    def scripts(version: str):
+        if version != JS_VERSION:
+            return Response("Not found.", status_code=404)
+        return Response(
+            APP_JS,
+            media_type='text/javascript',
+            headers={'Cache-Control': 'public, max-age=31536000, immutable'},
+        )
+    
+    # HTML fragments (TOC, OCR results, galleries) are highly repetitive markup;
+    # images and ZIP downloads are sent as-is
+    app.add_middleware(_TextGZipMiddleware, minimum_size=500, compresslevel=5)
+    
     # Setup routes
     main_routes.setup_routes(app, rt)
     pdf_routes.setup_routes(app, rt)
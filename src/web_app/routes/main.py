@@ -3,6 +3,7 @@
 import asyncio
 import uuid
 from datetime import datetime
+from functools import lru_cache
 from fasthtml.common import *
 from starlette.requests import Request
 from starlette.responses import JSONResponse
@@ -15,12 +16,11 @@ from web_app.core.database import (
     FileRecord, get_file_info, update_last_accessed, insert_file_record
 )
 from web_app.core.utils import calculate_file_hash, sanitize_filename
-from web_app.services.pdf_service import get_page_count
-from web_app.services.pptx_service import convert_pptx_to_pdf_bytes
+from web_app.services.pdf_service import get_page_count, run_mupdf
+from web_app.services.pptx_service import convert_pptx_to_pdf
 from web_app.ui.components import (
     upload_form, file_info_display, operation_buttons,
-    error_message, upload_progress_poll, upload_progress_status,
-    url_input_form,
+    error_message, upload_progress_poll, url_input_form,
 )
 
 # Map MIME types / extensions to internal file_type labels
@@ -75,7 +75,7 @@ async def _register_local_file(content: bytes, original_filename: str, file_type
     await asyncio.to_thread(file_path.write_bytes, content)
 
     page_count = (
-        await asyncio.to_thread(get_page_count, file_path) if file_type == "pdf" else 1
+        await run_mupdf(get_page_count, file_path) if file_type == "pdf" else 1
     )
     file_info = FileRecord(
         file_hash=file_hash,
@@ -114,33 +114,37 @@ async def _run_upload_task(
                                 "result": (existing, True)}
             return
 
-        # Convert PPTX/PPT → PDF before saving
+        # PPTX/PPT is stored as the PDF LibreOffice converts it to
+        pptx_filename = None
         if file_type == "pptx":
-            _tasks[task_id] = {"phase": "Converting to PDF…", "pct": 55}
-            await asyncio.sleep(0)
-            content = await convert_pptx_to_pdf_bytes(content, original_filename)
+            pptx_filename = original_filename
             original_filename = Path(original_filename).stem + ".pdf"
             file_type = "pdf"
 
-        _tasks[task_id] = {"phase": "Saving file…", "pct": 70}
-        await asyncio.sleep(0)
-
         safe_filename   = sanitize_filename(original_filename)
         stored_filename = f"{file_hash[:8]}_{safe_filename}"
         file_path       = UPLOAD_DIR / stored_filename
-        await asyncio.to_thread(file_path.write_bytes, content)
+        if pptx_filename:
+            _tasks[task_id] = {"phase": "Converting to PDF…", "pct": 55}
+            await asyncio.sleep(0)
+            # The converted PDF is moved straight into place, never read into memory
+            await convert_pptx_to_pdf(content, pptx_filename, file_path)
+        else:
+            _tasks[task_id] = {"phase": "Saving file…", "pct": 70}
+            await asyncio.sleep(0)
+            await asyncio.to_thread(file_path.write_bytes, content)
 
         _tasks[task_id] = {"phase": "Reading document info…", "pct": 85}
         await asyncio.sleep(0)
 
         page_count = (
-            await asyncio.to_thread(get_page_count, file_path) if file_type == "pdf" else 1
+            await run_mupdf(get_page_count, file_path) if file_type == "pdf" else 1
         )
         file_info = FileRecord(
             file_hash=file_hash,
             original_filename=original_filename,
             stored_filename=stored_filename,
-            file_size=len(content),
+            file_size=file_path.stat().st_size,
             page_count=page_count,
             file_type=file_type,
             upload_date=datetime.now().isoformat(),
@@ -156,6 +160,20 @@ async def _run_upload_task(
         _tasks[task_id] = {"phase": "error", "pct": 0, "error": str(exc)}
 
 
+@lru_cache(maxsize=1)
+def _index_body_html() -> str:
+    """Landing-page body; every part of it is static, so serialize it once."""
+    return to_xml(Div(
+        P(
+            f"PDF · PPT · Images · URL to Markdown  ·  max {MAX_FILE_SIZE_MB} MB  ·  files kept 30 days",
+            cls="page-subtitle",
+        ),
+        upload_form(),
+        url_input_form(),
+        cls="app-wrap",
+    ))
+
+
 def setup_routes(app, rt):
     """Set up main routes for the application."""
 
@@ -163,17 +181,7 @@ def setup_routes(app, rt):
 
     @rt('/')
     def index():
-        return Titled("PDF & Image Utilities",
-            Div(
-                P(
-                    f"PDF · PPT · Images · URL to Markdown  ·  max {MAX_FILE_SIZE_MB} MB  ·  files kept 30 days",
-                    cls="page-subtitle",
-                ),
-                upload_form(),
-                url_input_form(),
-                cls="app-wrap",
-            )
-        )
+        return Titled("PDF & Image Utilities", NotStr(_index_body_html()))
 
     # ── Upload (HTMX multipart POST) ─────────────────────────────────────────
 
@@ -222,11 +230,11 @@ def setup_routes(app, rt):
             import traceback; traceback.print_exc()
             return error_message(f"Upload error: {exc}")
 
-    # ── Upload status polling (4 Hz) ─────────────────────────────────────────
+    # ── Upload status polling (backs off from 200 ms to 2 s) ─────────────────
 
     @rt('/upload-status/{task_id}')
-    def upload_status(task_id: str):
-        """Polled by HTMX every 250 ms.  Returns either:
+    def upload_status(task_id: str, n: int = 0):
+        """Polled by HTMX with a growing delay.  Returns either:
         - A fresh progress bar (still processing)
         - The file info + operation buttons (done)
         - An error message (failed)
@@ -247,14 +255,7 @@ def setup_routes(app, rt):
             return error_message(f"Upload failed: {err}")
 
         # Still in progress – return self-refreshing polling div
-        return Div(
-            upload_progress_status(task["phase"], task["pct"]),
-            id="upload-poll",
-            hx_get=f"/upload-status/{task_id}",
-            hx_trigger="every 250ms",
-            hx_target="this",
-            hx_swap="outerHTML",
-        )
+        return upload_progress_poll(task_id, task["phase"], task["pct"], n)
 
     # ── GCS direct-upload API routes (kept for backward compat) ──────────────
 
@@ -336,7 +337,7 @@ def setup_routes(app, rt):
             await download_from_gcs(GCS_BUCKET_NAME, gcs_object_name, tmp_path,
                                     GCS_CREDENTIALS_FILE)
 
-            content   = tmp_path.read_bytes()
+            content   = await asyncio.to_thread(tmp_path.read_bytes)
             file_info, is_existing = await _register_local_file(
                 content, original_filename, file_type
             )
@@ -1,29 +1,193 @@
 """PDF processing routes."""
 
-from typing import Optional
+from typing import Iterator, Optional
+from collections import OrderedDict
 from pathlib import Path
+import asyncio
+import hashlib
+import os
 import zipfile
 import io
 import re
 import time
+import uuid
 from fasthtml.common import *
-from starlette.responses import StreamingResponse
-from pdf_utils.config import UPLOAD_DIR, MIN_DPI, MAX_DPI, DEFAULT_DPI
+from html import escape as html_escape
+from starlette.responses import Response, StreamingResponse
+from pdf_utils.config import (
+    UPLOAD_DIR, MIN_DPI, MAX_DPI, DEFAULT_DPI, OCR_RESULT_TTL, TEXT_PREVIEW_CHARS,
+    EXTRACTED_IMAGES_CACHE_SIZE,
+)
+from pdf_utils import config as _config
 from web_app.core.database import get_file_info
 from web_app.core.utils import count_tokens
 from web_app.services import pdf_service
+from web_app.ui import components as _components
 from web_app.ui.components import (
-    error_message, toc_display, image_extraction_gallery, ocr_result_display,
-    chapters_form_display, chapters_result_display,
+    error_message, toc_display, toc_items_batch, image_extraction_gallery, image_gallery_batch,
+    ocr_result_display, ocr_progress_shell, ocr_progress_poll, ocr_progress_log,
+    chapters_form_display, chapters_result_display, copy_file_button, preview_text,
 )
 from web_app.services import ocr_service
 
 
+class _ZipChunkWriter:
+    """Write-only, non-seekable sink that hands zipfile output back in chunks."""
+    
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._offset
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _stream_image_zip(images_data: dict) -> Iterator[bytes]:
+    """Yield a ZIP of extracted images one entry at a time.
+    
+    Entries are STORED: the images are already JPEG-compressed, so deflate
+    would only delay the first byte.
+    """
+    writer = _ZipChunkWriter()
+    with zipfile.ZipFile(writer, 'w', zipfile.ZIP_STORED) as zip_file:
+        for page_images in images_data.values():
+            for img_data in page_images:
+                zip_file.writestr(img_data['filename'], img_data['raw_data'])
+                yield writer.drain()
+    # Central directory is written on close
+    yield writer.drain()
+
+
+# Lazy-load batches are fully determined by their URL (files are addressed by
+# content hash), so browsers may reuse them for a while and then revalidate
+_FRAGMENT_CACHE_CONTROL = 'private, max-age=3600'
+
+# Saved text results that /text-tail may stream
+_TEXT_RESULT_SUFFIXES = {'.txt', '.md'}
+
+# Fragment ETags include a version of the code that renders them (components
+# and the batch sizes in config), so a deploy that changes the HTML never
+# revalidates a stale copy. They are weak validators because the fragments
+# may be gzipped, and a strong ETag must change with the content-encoding.
+_MARKUP_VERSION = hashlib.sha256(b"".join(
+    Path(module.__file__).read_bytes() for module in (_components, _config)
+)).hexdigest()[:12]
+
+
+# ── In-memory extracted-image store (per-process, LRU) ─────────────────────
+# The gallery, its image/thumbnail requests and the ZIP download all read the
+# same extraction, keyed by (file_hash, start_page, end_page). Concurrent
+# misses for one key await a single extraction task.
+_extracted_images: "OrderedDict[tuple, dict]" = OrderedDict()
+_extraction_tasks: dict[tuple, asyncio.Task] = {}
+
+
+async def _extract_images_cached(file_path: Path, file_hash: str,
+                                 start_page: int, end_page: int) -> dict:
+    """Return extracted images for a validated page range, extracting at most once."""
+    key = (file_hash, start_page, end_page)
+    if key in _extracted_images:
+        _extracted_images.move_to_end(key)
+        return _extracted_images[key]
+    
+    task = _extraction_tasks.get(key)
+    if task is None:
+        async def extract() -> dict:
+            try:
+                print(f"Extracting images from pages {start_page} to {end_page} from: {file_path}")
+                images_data = await pdf_service.extract_images_from_pages_async(
+                    file_path, start_page, end_page
+                )
+                _extracted_images[key] = images_data
+                while len(_extracted_images) > EXTRACTED_IMAGES_CACHE_SIZE:
+                    _extracted_images.popitem(last=False)
+                return images_data
+            finally:
+                _extraction_tasks.pop(key, None)
+        
+        task = _extraction_tasks[key] = asyncio.create_task(extract())
+    
+    # A cancelled request must not cancel the extraction others are awaiting
+    return await asyncio.shield(task)
+
+
+# ── In-memory OCR task store (per-process, like the upload task store) ─────
+# Structure: { task_id: { "phase": "running", "messages": [str] }
+#                      | { "phase": "done",  "result": dict of ocr_result_display kwargs }
+#                      | { "phase": "error", "error": str } }
+_ocr_tasks: dict[str, dict] = {}
+
+# Strong references to the running OCR coroutines: the event loop only keeps
+# weak ones, so an unreferenced task could be garbage-collected mid-run
+_ocr_background_tasks: set[asyncio.Task] = set()
+
+
+async def _run_ocr_task(task_id: str, file_info, file_hash: str,
+                        start_page: int, end_page: int) -> None:
+    """Background coroutine: run LLM OCR and store the rendered-result inputs in _ocr_tasks."""
+    try:
+        file_path = UPLOAD_DIR / file_info.stored_filename
+        progress_messages = _ocr_tasks[task_id]["messages"]
+        
+        def progress_callback(message: str):
+            progress_messages.append(message)
+            print(f"OCR Progress: {message}")
+        
+        # Process pages with async OCR
+        print(f"Starting async LLM OCR extraction for pages {start_page} to {end_page} from: {file_path}")
+        results = await ocr_service.process_pages_async_batch(
+            file_path, 
+            start_page, 
+            end_page,
+            progress_callback=progress_callback
+        )
+        
+        # Add progress messages to results for display
+        results["progress_messages"] = progress_messages
+        
+        # Save text to file for download
+        # Calculate cache hit rate for filename
+        pages_processed = results.get('pages_processed', 0)
+        cached_pages_count = len(results.get('cached_pages', []))
+        cache_hit_rate = (cached_pages_count / pages_processed) * 100 if pages_processed > 0 else 0
+        cache_info = f"_cache{cache_hit_rate:.0f}pct" if cache_hit_rate > 0 else ""
+        text_filename = f"mcp_{file_info.stored_filename.replace('.pdf', '')}_async_ocr_p{start_page}-{end_page}{cache_info}.txt"
+        text_path = UPLOAD_DIR / text_filename
+        await asyncio.to_thread(text_path.write_text, results["full_text"], encoding='utf-8')
+        
+        _ocr_tasks[task_id] = {"phase": "done", "result": {
+            "results": results,
+            "file_hash": file_hash,
+            "start_page": start_page,
+            "end_page": end_page,
+            "text_filename": text_filename,
+        }}
+    
+    except Exception as e:
+        print(f"Error in async LLM OCR extraction: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        _ocr_tasks[task_id] = {"phase": "error", "error": str(e)}
+
+
 def setup_routes(app, rt):
     """Set up PDF processing routes."""
     
     @rt('/process/toc/{file_hash}')
-    def process_toc(file_hash: str):
+    async def process_toc(file_hash: str):
         """Extract and display table of contents."""
         try:
             file_info = get_file_info(file_hash)
@@ -33,13 +197,36 @@ def setup_routes(app, rt):
             file_path = UPLOAD_DIR / file_info.stored_filename
             
             # Extract TOC
-            toc = pdf_service.extract_toc(file_path)
-            return toc_display(toc)
+            toc = await pdf_service.run_mupdf(pdf_service.extract_toc, file_path)
+            return toc_display(toc, file_hash)
             
         except Exception as e:
             return Div(error_message(f"Error extracting TOC: {str(e)}"))
     
     
+    @rt('/toc-page/{file_hash}/{offset}')
+    async def toc_page(file_hash: str, offset: int, request):
+        """Return the next lazily loaded batch of TOC entries."""
+        etag = f'W/"toc-{_MARKUP_VERSION}-{file_hash}-{offset}"'
+        cache_headers = {'Cache-Control': _FRAGMENT_CACHE_CONTROL, 'ETag': etag}
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers=cache_headers)
+        
+        file_info = get_file_info(file_hash)
+        if not file_info:
+            return ""
+        
+        # extract_toc is served from the result cache after the first call
+        toc = await pdf_service.run_mupdf(
+            pdf_service.extract_toc, UPLOAD_DIR / file_info.stored_filename
+        )
+        return Response(
+            to_xml(toc_items_batch(toc, file_hash, offset)),
+            media_type='text/html',
+            headers=cache_headers
+        )
+    
+    
     @rt('/extract-pages-form/{file_hash}')
     def extract_pages_form(file_hash: str):
         """Show form for page extraction."""
@@ -96,7 +283,9 @@ def setup_routes(app, rt):
             print(f"Upload directory: {UPLOAD_DIR.resolve()}")
             
             output_filename = f"mcp_{file_info.stored_filename.replace('.pdf', '')}_pages_{start_page}_to_{end_page}.pdf"
-            output_path = pdf_service.extract_pages(file_path, start_page, end_page, output_filename)
+            output_path = await pdf_service.run_mupdf(
+                pdf_service.extract_pages, file_path, start_page, end_page, output_filename
+            )
             
             # Verify file was created
             if output_path.exists():
@@ -189,20 +378,23 @@ def setup_routes(app, rt):
             print(f"Converting pages {start_page} to {end_page} from: {file_path}")
             print(f"Upload directory: {UPLOAD_DIR.resolve()}")
             
-            image_files = pdf_service.convert_pages_to_images(
+            # Render off the event loop so other requests keep being served
+            image_files = await pdf_service.convert_pages_to_images_async(
                 file_path, start_page, end_page, dpi, image_format
             )
             
             # Create image gallery
             image_elements = []
+            upload_dir = str(UPLOAD_DIR)
             for img_file in image_files:
                 # Double-check file exists before adding to gallery
-                img_path = UPLOAD_DIR / img_file
-                if img_path.exists():
+                img_path = os.path.join(upload_dir, img_file)
+                if os.path.exists(img_path):
                     image_elements.append(
                         Div(
                             A(
-                                Img(src=f"/{img_file}", cls="image-thumb"),
+                                Img(src=f"/{img_file}", loading="lazy", decoding="async",
+                                    cls="image-thumb"),
                                 href=f"/{img_file}",
                                 download=img_file
                             )
@@ -287,9 +479,13 @@ def setup_routes(app, rt):
             
             # Extract text
             if use_markdown:
-                text_content = pdf_service.extract_text_markdown(file_path, start_page, end_page)
+                text_content = await pdf_service.run_mupdf(
+                    pdf_service.extract_text_markdown, file_path, start_page, end_page
+                )
             else:
-                text_content = pdf_service.extract_text_plain(file_path, start_page, end_page)
+                text_content = await pdf_service.run_mupdf(
+                    pdf_service.extract_text_plain, file_path, start_page, end_page
+                )
             
             # Save text to file for download
             text_filename = f"mcp_{file_info.stored_filename.replace('.pdf', '')}_text_p{start_page}-{end_page}.txt"
@@ -311,9 +507,6 @@ def setup_routes(app, rt):
                 print(f"ERROR: Failed to create text file: {text_path}")
                 return Div(error_message("Failed to create text file."))
             
-            # Show full text in preview
-            preview = text_content
-            
             # Debug download link generation
             download_url = f"/{text_filename}"
             print(f"Creating download link with href: {download_url}")
@@ -339,22 +532,12 @@ def setup_routes(app, rt):
                     A("⬇ Download Text",
                       href=download_url,
                       download=text_filename,
-                      cls="button",
-                      style="background:var(--green);"),
-                    Button(
-                        "📋 Copy",
-                        onclick=(
-                            f"const t=document.getElementById('{preview_id}').textContent;"
-                            f"navigator.clipboard.writeText(t).then(()=>{{"
-                            f"this.textContent='✅ Copied!';this.style.background='var(--green)';"
-                            f"setTimeout(()=>{{this.textContent='📋 Copy';this.style.background='';}},2000);}});"
-                        ),
-                        cls="button",
-                    ),
+                      cls="button btn-green"),
+                    copy_file_button(text_filename),
                     cls="action-row",
                 ),
                 H4("Preview"),
-                Pre(preview, id=preview_id, cls="text-preview"),
+                Pre(*preview_text(text_content, text_filename), id=preview_id, cls="text-preview"),
                 cls="result-area"
             )
             
@@ -381,9 +564,13 @@ def setup_routes(app, rt):
             
             # Extract the same text as in the original extraction
             if use_markdown:
-                text_content = pdf_service.extract_text_markdown(file_path, start_page, end_page)
+                text_content = await pdf_service.run_mupdf(
+                    pdf_service.extract_text_markdown, file_path, start_page, end_page
+                )
             else:
-                text_content = pdf_service.extract_text_plain(file_path, start_page, end_page)
+                text_content = await pdf_service.run_mupdf(
+                    pdf_service.extract_text_plain, file_path, start_page, end_page
+                )
 
             # Calculate token count (runs in background thread to avoid blocking)
             token_count = await count_tokens(text_content)
@@ -408,7 +595,7 @@ def setup_routes(app, rt):
             Div(
                 Span(f"{file_info.page_count} pages total", cls="pill"),
                 Span("min 25×25 px · max 12/page", cls="pill"),
-                cls="file-meta", style="margin-bottom:.75rem;",
+                cls="file-meta spaced",
             ),
             Form(
                 Div(
@@ -423,8 +610,7 @@ def setup_routes(app, rt):
                     cls="form-row",
                 ),
                 Div(
-                    Button("Extract Images", type="submit",
-                           style="background:var(--green);"),
+                    Button("Extract Images", type="submit", cls="btn-green"),
                     Span(Span(cls="spinner"), " Extracting…",
                          id="extract-imgs-indicator", cls="htmx-indicator"),
                     cls="action-row",
@@ -451,17 +637,7 @@ def setup_routes(app, rt):
             if start_page < 1 or end_page > file_info.page_count or start_page > end_page:
                 return Div(error_message("Invalid page range."))
             
-            # Extract images
-            print(f"Extracting images from pages {start_page} to {end_page} from: {file_path}")
-            images_data = pdf_service.extract_images_from_pages(file_path, start_page, end_page)
-            
-            # Store images data in app context for ZIP download
-            # Note: In production, consider using a cache with TTL
-            if not hasattr(app, 'extracted_images_cache'):
-                app.extracted_images_cache = {}
-            
-            cache_key = f"{file_hash}_{start_page}_{end_page}"
-            app.extracted_images_cache[cache_key] = images_data
+            images_data = await _extract_images_cached(file_path, file_hash, start_page, end_page)
             
             # Return gallery view
             return image_extraction_gallery(images_data, file_hash, start_page, end_page)
@@ -473,48 +649,114 @@ def setup_routes(app, rt):
             return Div(error_message(f"Error extracting images: {str(e)}"))
     
     
+    async def get_extracted_images(file_hash: str, start_page: int, end_page: int) -> Optional[dict]:
+        """Return extracted images for a page range, or None for an unknown file or invalid range."""
+        file_info = get_file_info(file_hash)
+        if not file_info:
+            return None
+        
+        if start_page < 1 or end_page > file_info.page_count or start_page > end_page:
+            return None
+        
+        file_path = UPLOAD_DIR / file_info.stored_filename
+        return await _extract_images_cached(file_path, file_hash, start_page, end_page)
+    
+    
+    @rt('/extracted-image/{file_hash}/{start_page}/{end_page}/{page_num}/{image_index}')
+    async def extracted_image(file_hash: str, start_page: int, end_page: int,
+                              page_num: int, image_index: int, request):
+        """Serve a single extracted image as raw JPEG bytes."""
+        # The URL pins the source file (by content hash), page range and image,
+        # so the bytes never change: let the browser keep them and revalidate
+        # by ETag without re-extracting anything
+        etag = f'"{file_hash}-{start_page}-{end_page}-{page_num}-{image_index}"'
+        cache_headers = {
+            'Cache-Control': 'private, max-age=31536000, immutable',
+            'ETag': etag,
+        }
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers=cache_headers)
+        
+        images_data = await get_extracted_images(file_hash, start_page, end_page) or {}
+        page_images = images_data.get(page_num, [])
+        if not 0 <= image_index < len(page_images):
+            return Response("Image not found.", status_code=404)
+        
+        return Response(
+            page_images[image_index]['raw_data'],
+            media_type='image/jpeg',
+            headers=cache_headers
+        )
+    
+    
+    @rt('/extracted-thumb/{file_hash}/{start_page}/{end_page}/{page_num}/{image_index}')
+    async def extracted_thumb(file_hash: str, start_page: int, end_page: int,
+                              page_num: int, image_index: int, request):
+        """Serve a gallery-sized JPEG thumbnail of an extracted image."""
+        etag = f'"{file_hash}-{start_page}-{end_page}-{page_num}-{image_index}-thumb"'
+        cache_headers = {
+            'Cache-Control': 'private, max-age=31536000, immutable',
+            'ETag': etag,
+        }
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers=cache_headers)
+        
+        images_data = await get_extracted_images(file_hash, start_page, end_page) or {}
+        page_images = images_data.get(page_num, [])
+        if not 0 <= image_index < len(page_images):
+            return Response("Image not found.", status_code=404)
+        
+        # Generated on first request and kept next to the full image in the
+        # shared extracted-image store, so later requests reuse it
+        img_data = page_images[image_index]
+        if 'thumb_data' not in img_data:
+            img_data['thumb_data'] = await asyncio.to_thread(
+                pdf_service.make_thumbnail, img_data['raw_data']
+            )
+        
+        return Response(
+            img_data['thumb_data'],
+            media_type='image/jpeg',
+            headers=cache_headers
+        )
+    
+    
+    @rt('/extracted-image-gallery/{file_hash}/{start_page}/{end_page}/{offset}')
+    async def extracted_image_gallery(file_hash: str, start_page: int, end_page: int,
+                                      offset: int, request):
+        """Return the next lazily loaded batch of the extracted-images gallery."""
+        etag = f'W/"gallery-{_MARKUP_VERSION}-{file_hash}-{start_page}-{end_page}-{offset}"'
+        cache_headers = {'Cache-Control': _FRAGMENT_CACHE_CONTROL, 'ETag': etag}
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers=cache_headers)
+        
+        images_data = await get_extracted_images(file_hash, start_page, end_page)
+        if images_data is None:
+            return ""
+        
+        return Response(
+            "".join(to_xml(el) for el in
+                    image_gallery_batch(images_data, file_hash, start_page, end_page, offset)),
+            media_type='text/html',
+            headers=cache_headers
+        )
+    
+    
     @rt('/download-image-zip/{file_hash}/{start_page}/{end_page}')
     async def download_image_zip(file_hash: str, start_page: int, end_page: int):
         """Generate and download a ZIP file containing all extracted images."""
         try:
-            # Check if images are in cache
-            cache_key = f"{file_hash}_{start_page}_{end_page}"
-            
-            # If not in cache, extract them again
-            if not hasattr(app, 'extracted_images_cache') or cache_key not in app.extracted_images_cache:
-                file_info = get_file_info(file_hash)
-                if not file_info:
-                    return Div(error_message("File not found."))
-                
-                file_path = UPLOAD_DIR / file_info.stored_filename
-                images_data = pdf_service.extract_images_from_pages(file_path, start_page, end_page)
-            else:
-                images_data = app.extracted_images_cache[cache_key]
+            # Use cached images, or extract them again
+            images_data = await get_extracted_images(file_hash, start_page, end_page)
+            if images_data is None:
+                return Div(error_message("File not found or invalid page range."))
             
             if not images_data:
                 return Div(error_message("No images to download."))
             
-            # Create ZIP file in memory
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for page_num, page_images in images_data.items():
-                    for img_data in page_images:
-                        # Use raw_data if available, otherwise decode from base64
-                        if 'raw_data' in img_data:
-                            image_bytes = img_data['raw_data']
-                        else:
-                            # Extract base64 data and decode
-                            base64_str = img_data['data'].split(',')[1]
-                            import base64
-                            image_bytes = base64.b64decode(base64_str)
-                        
-                        zip_file.writestr(img_data['filename'], image_bytes)
-            
-            zip_buffer.seek(0)
-            
-            # Return as streaming response
+            # Stream the archive entry by entry instead of building it in memory
             return StreamingResponse(
-                zip_buffer,
+                _stream_image_zip(images_data),
                 media_type='application/zip',
                 headers={
                     'Content-Disposition': f'attachment; filename="extracted_images_p{start_page}-{end_page}.zip"'
@@ -528,6 +770,25 @@ def setup_routes(app, rt):
             return Div(error_message(f"Error creating ZIP file: {str(e)}"))
     
     
+    @rt('/text-tail/{filename}')
+    def text_tail(filename: str):
+        """Stream the part of a saved text result beyond the inline preview, HTML-escaped."""
+        # Only the generated text results, never uploads or images
+        text_path = UPLOAD_DIR / filename
+        if (Path(filename).name != filename or text_path.suffix not in _TEXT_RESULT_SUFFIXES
+                or not text_path.is_file()):
+            return Response("Not found.", status_code=404)
+        
+        def gen():
+            # newline='' keeps character offsets identical to the in-memory text
+            with open(text_path, encoding='utf-8', newline='') as f:
+                f.read(TEXT_PREVIEW_CHARS)
+                while chunk := f.read(65536):
+                    yield html_escape(chunk)
+        
+        return StreamingResponse(gen(), media_type='text/html; charset=utf-8')
+    
+    
     @rt('/extract-text-llm-form/{file_hash}')
     def extract_text_llm_form(file_hash: str):
         """Show form for LLM-based text extraction with OCR."""
@@ -540,7 +801,7 @@ def setup_routes(app, rt):
             Div(
                 Span(f"{file_info.page_count} pages total", cls="pill"),
                 Span("AI · LaTeX · caching", cls="pill"),
-                cls="file-meta", style="margin-bottom:.75rem;",
+                cls="file-meta spaced",
             ),
             Form(
                 Div(
@@ -555,8 +816,7 @@ def setup_routes(app, rt):
                     cls="form-row",
                 ),
                 Div(
-                    Button("Extract with OCR", type="submit",
-                           style="background:var(--purple);"),
+                    Button("Extract with OCR", type="submit", cls="btn-purple"),
                     Span(Span(cls="spinner"), " Running OCR…",
                          id="ocr-indicator", cls="htmx-indicator"),
                     cls="action-row",
@@ -571,61 +831,65 @@ def setup_routes(app, rt):
     
     @rt('/process/extract-text-llm/{file_hash}')
     async def process_extract_text_llm(file_hash: str, start_page: int, end_page: int):
-        """Extract text using async LLM OCR with caching and batch processing."""
+        """Start async LLM OCR in the background and return a polling shell."""
         try:
             file_info = get_file_info(file_hash)
             if not file_info:
                 return Div(error_message("File not found."))
             
-            file_path = UPLOAD_DIR / file_info.stored_filename
-            
             # Validate page range
             if start_page < 1 or end_page > file_info.page_count or start_page > end_page:
                 return Div(error_message("Invalid page range."))
             
-            # Store progress messages
-            progress_messages = []
-            
-            def progress_callback(message: str):
-                progress_messages.append(message)
-                print(f"OCR Progress: {message}")
-            
-            # Process pages with async OCR
-            print(f"Starting async LLM OCR extraction for pages {start_page} to {end_page} from: {file_path}")
-            results = await ocr_service.process_pages_async_batch(
-                file_path, 
-                start_page, 
-                end_page,
-                progress_callback=progress_callback
+            task_id = uuid.uuid4().hex[:12]
+            _ocr_tasks[task_id] = {"phase": "running", "messages": []}
+            task = asyncio.create_task(
+                _run_ocr_task(task_id, file_info, file_hash, start_page, end_page)
             )
+            _ocr_background_tasks.add(task)
+            task.add_done_callback(_ocr_background_tasks.discard)
+            # Drop results nobody came back for, counting from when they finish
+            task.add_done_callback(lambda _: asyncio.get_running_loop().call_later(
+                OCR_RESULT_TTL, lambda: _ocr_tasks.pop(task_id, None)
+            ))
             
-            # Add progress messages to results for display
-            results["progress_messages"] = progress_messages
-            
-            # Save text to file for download
-            # Calculate cache hit rate for filename
-            pages_processed = results.get('pages_processed', 0)
-            cached_pages_count = len(results.get('cached_pages', []))
-            cache_hit_rate = (cached_pages_count / pages_processed) * 100 if pages_processed > 0 else 0
-            cache_info = f"_cache{cache_hit_rate:.0f}pct" if cache_hit_rate > 0 else ""
-            text_filename = f"mcp_{file_info.stored_filename.replace('.pdf', '')}_async_ocr_p{start_page}-{end_page}{cache_info}.txt"
-            text_path = UPLOAD_DIR / text_filename
-            text_path.write_text(results["full_text"], encoding='utf-8')
-            
-            # Return the formatted result display
-            return ocr_result_display(
-                results=results,
-                file_hash=file_hash,
-                start_page=start_page,
-                end_page=end_page,
-                text_filename=text_filename
-            )
+            return ocr_progress_shell(task_id)
             
         except Exception as e:
-            print(f"Error in async LLM OCR extraction: {str(e)}")
+            print(f"Error starting async LLM OCR extraction: {str(e)}")
             import traceback
             traceback.print_exc()
             return Div(error_message(f"Error extracting text with LLM: {str(e)}"))
+    
+    
+    @rt('/ocr-status/{task_id}')
+    def ocr_status(task_id: str, since: int = 0):
+        """Polled by HTMX until the OCR task finishes, then swaps in the result.
+        
+        While running, each poll returns the small status line plus only the
+        progress messages added since the last poll (appended out-of-band).
+        """
+        task = _ocr_tasks.get(task_id)
+        if task is None:
+            return Div(error_message("OCR session expired – please try again."))
+        
+        # The final result repeats the whole log, so drop the live one
+        clear_log = Ul(id="ocr-live-log", hx_swap_oob="delete")
+        
+        if task["phase"] == "done":
+            _ocr_tasks.pop(task_id, None)
+            return ocr_result_display(**task["result"]), clear_log
+        
+        if task["phase"] == "error":
+            _ocr_tasks.pop(task_id, None)
+            return Div(error_message(f"Error extracting text with LLM: {task['error']}")), clear_log
+        
+        messages = task["messages"]
+        total = len(messages)
+        poll = ocr_progress_poll(task_id, messages[-1] if messages else "Starting OCR…", total)
+        if total > since:
+            return poll, ocr_progress_log(messages[since:total])
+        return poll
 
 
     @rt('/extract-text-llm-image/{file_hash}')
@@ -640,15 +904,14 @@ def setup_routes(app, rt):
             Div(
                 Span(file_info.original_filename, cls="pill"),
                 Span(f"{file_info.file_size / 1024 / 1024:.1f} MB", cls="pill"),
-                cls="file-meta", style="margin-bottom:.75rem;",
+                cls="file-meta spaced",
             ),
             Div(
                 Button("Extract Text",
                        hx_post=f"/process/extract-text-llm-image/{file_hash}",
                        hx_target="#operation-result",
                        hx_indicator="#img-ocr-indicator",
-                       cls="button",
-                       style="background:var(--purple);"),
+                       cls="button btn-purple"),
                 Span(Span(cls="spinner"), " Running OCR…",
                      id="img-ocr-indicator", cls="htmx-indicator"),
                 cls="action-row",
@@ -736,23 +999,13 @@ def setup_routes(app, rt):
                     A("⬇ Download Text",
                       href=f"/{text_filename}",
                       download=text_filename,
-                      cls="button",
-                      style="background:var(--green);"),
-                    Button(
-                        "📋 Copy",
-                        onclick=(
-                            f"const t=document.getElementById('{preview_id}').textContent;"
-                            f"navigator.clipboard.writeText(t).then(()=>{{"
-                            f"this.textContent='✅ Copied!';this.style.background='var(--green)';"
-                            f"setTimeout(()=>{{this.textContent='📋 Copy';this.style.background='';}},2000);}});"
-                        ),
-                        cls="button",
-                    ),
+                      cls="button btn-green"),
+                    copy_file_button(text_filename),
                     cls="action-row",
                 ),
 
                 H4("Preview"),
-                Pre(results["full_text"], id=preview_id, cls="text-preview"),
+                Pre(*preview_text(results["full_text"], text_filename), id=preview_id, cls="text-preview"),
 
                 cls="result-area"
             )
@@ -765,7 +1018,7 @@ def setup_routes(app, rt):
 
 
     @rt('/download-chapters-form/{file_hash}')
-    def download_chapters_form(file_hash: str):
+    async def download_chapters_form(file_hash: str):
         """Show chapter list derived from TOC, with download button."""
         try:
             file_info = get_file_info(file_hash)
@@ -773,7 +1026,7 @@ def setup_routes(app, rt):
                 return Div(error_message("File not found."))
 
             file_path = UPLOAD_DIR / file_info.stored_filename
-            toc = pdf_service.extract_toc(file_path)
+            toc = await pdf_service.run_mupdf(pdf_service.extract_toc, file_path)
             chapters = pdf_service.compute_chapter_ranges(toc, file_info.page_count)
             return chapters_form_display(chapters, file_hash)
 
@@ -797,7 +1050,7 @@ def setup_routes(app, rt):
                 return Div(error_message("No chapters selected."))
 
             file_path = UPLOAD_DIR / file_info.stored_filename
-            toc = pdf_service.extract_toc(file_path)
+            toc = await pdf_service.run_mupdf(pdf_service.extract_toc, file_path)
             all_chapters = pdf_service.compute_chapter_ranges(toc, file_info.page_count)
             chapters = [ch for ch in all_chapters if ch["index"] in selected_indices]
 
@@ -847,7 +1100,7 @@ def setup_routes(app, rt):
             stem = file_info.stored_filename.rsplit('.', 1)[0]
             zip_filename = f"chapters_{stem}.zip"
             zip_path = UPLOAD_DIR / zip_filename
-            zip_path.write_bytes(zip_buf.getvalue())
+            zip_path.write_bytes(zip_buf.getbuffer())  # write the buffer in place, no bytes copy
 
             return chapters_result_display(chapter_results, zip_filename, total_time)
 
@@ -2,7 +2,7 @@
 
 import asyncio
 from datetime import datetime, timedelta
-from pdf_utils.config import FILE_RETENTION_DAYS, UPLOAD_DIR
+from pdf_utils.config import FILE_RETENTION_DAYS, UPLOAD_DIR, PDF_RESULT_CACHE_DIR
 from web_app.core.database import get_old_files, delete_file_record
 
 
@@ -25,6 +25,10 @@ async def cleanup_old_files():
         for f in UPLOAD_DIR.glob(f"mcp_{base_name}_*"):
             f.unlink()
         
+        # Delete cached TOC/text extraction results
+        for f in PDF_RESULT_CACHE_DIR.glob(f"{base_name}_*"):
+            f.unlink()
+        
         # Remove from database
         delete_file_record(file_record.file_hash)
     
@@ -3,13 +3,16 @@
 import sqlite3
 import hashlib
 import asyncio
+import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List
 from contextlib import asynccontextmanager
 import aiosqlite
 from pdf_utils.config import OCR_CACHE_RETENTION_DAYS, OCR_CACHE_DB_PATH
 
+logger = logging.getLogger(__name__)
+
 
 def compute_image_hash(base64_image: str) -> str:
     """
@@ -130,6 +133,29 @@ async def save_ocr_to_cache(
         await db.commit()
 
 
+async def save_ocr_batch_to_cache(
+    entries: List[Tuple[str, str, int, int, Optional[str], Optional[int]]]
+):
+    """
+    Save several OCR results to cache in a single transaction.
+    
+    Args:
+        entries: Tuples of (image_hash, ocr_text, input_tokens, output_tokens,
+            pdf_filename, page_num), as for save_ocr_to_cache
+    """
+    if not entries:
+        return
+    
+    async with aiosqlite.connect(OCR_CACHE_DB_PATH) as db:
+        await db.executemany("""
+            INSERT OR REPLACE INTO ocr_cache 
+            (image_hash, ocr_text, input_tokens, output_tokens, pdf_filename, page_num)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, entries)
+        
+        await db.commit()
+
+
 async def clean_old_cache_entries():
     """
     Remove cache entries older than OCR_CACHE_RETENTION_DAYS.
@@ -152,7 +178,7 @@ async def clean_old_cache_entries():
             """, (cutoff_date.isoformat(),))
             
             await db.commit()
-            print(f"Cleaned {count_to_delete} old OCR cache entries")
+            logger.info(f"Cleaned {count_to_delete} old OCR cache entries")
         
         # Also clean up entries that haven't been accessed in a while
         old_access_cutoff = datetime.now() - timedelta(days=OCR_CACHE_RETENTION_DAYS * 2)
@@ -171,7 +197,7 @@ async def clean_old_cache_entries():
             """, (old_access_cutoff.isoformat(),))
             
             await db.commit()
-            print(f"Cleaned {old_access_count} unused OCR cache entries")
+            logger.info(f"Cleaned {old_access_count} unused OCR cache entries")
 
 
 async def get_cache_stats() -> dict:
@@ -1,10 +1,13 @@
 """OCR service for extracting text from PDF pages using Google GenAI with native PDF processing and caching."""
 
 import os
-import io
 import asyncio
+import contextlib
+import logging
+import random
 import time
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Callable, Any
 import pymupdf
@@ -22,16 +25,21 @@ from pdf_utils.config import (
     OCR_CONCURRENT_REQUESTS,
     OCR_MAX_RETRIES,
     OCR_RETRY_DELAY_BASE,
+    OCR_REQUESTS_PER_MINUTE,
     OCR_BATCH_TIMEOUT
 )
+from .pdf_service import run_mupdf
 from .ocr_cache import (
     compute_content_hash,
     get_cached_ocr,
     save_ocr_to_cache,
+    save_ocr_batch_to_cache,
     clean_old_cache_entries,
     init_cache_database
 )
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables and initialize the GenAI client
 load_dotenv()
 
@@ -43,8 +51,44 @@ else:
     client = None
 
 
+class _RateLimiter:
+    """Token bucket that spaces LLM calls to stay under a requests-per-minute ceiling."""
+
+    def __init__(self, requests_per_minute: int, burst: int):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request token is available, then consume it."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# Request config is identical for every OCR call, so build it once
+OCR_GENERATION_CONFIG = types.GenerateContentConfig(
+    temperature=OCR_TEMPERATURE,
+    max_output_tokens=OCR_MAX_TOKENS
+)
+
+# Shared across all documents so concurrent requests respect one API budget
+rate_limiter = _RateLimiter(OCR_REQUESTS_PER_MINUTE, OCR_CONCURRENT_REQUESTS)
+
+
+@lru_cache(maxsize=1)
 def load_ocr_prompt() -> str:
-    """Load the OCR extraction prompt from prompts folder."""
+    """Load the OCR extraction prompt from prompts folder (read once per process)."""
     prompt_path = Path(__file__).parent.parent / "prompts" / "ocr_prompt_pdf.txt"
     try:
         with open(prompt_path, 'r', encoding='utf-8') as f:
@@ -83,16 +127,12 @@ def create_pdf_subset_bytes(pdf_path: Path, page_nums: List[int]) -> bytes:
     for page_idx in zero_based_pages:
         new_doc.insert_pdf(doc, from_page=page_idx, to_page=page_idx)
     
-    # Save to an in-memory buffer
-    buffer = io.BytesIO()
-    new_doc.save(buffer)
-    buffer.seek(0)
-    pdf_bytes = buffer.getvalue()
+    # Serialize straight to bytes (no intermediate BytesIO copy)
+    pdf_bytes = new_doc.tobytes()
     
     # Clean up
     new_doc.close()
     doc.close()
-    buffer.close()
     
     return pdf_bytes
 
@@ -124,6 +164,20 @@ def extract_with_pymupdf_fallback(pdf_path: Path, page_num: int) -> str:
             return f"[Error extracting text from page {page_num}: {str(e)}]"
 
 
+def extract_pages_with_pymupdf_fallback(pdf_path: Path, page_nums: List[int]) -> Dict[int, str]:
+    """
+    Run the PyMuPDF fallback over several pages sequentially.
+    
+    Args:
+        pdf_path: Path to PDF file
+        page_nums: Page numbers (1-based)
+        
+    Returns:
+        Mapping of page number to extracted text
+    """
+    return {page_num: extract_with_pymupdf_fallback(pdf_path, page_num) for page_num in page_nums}
+
+
 def create_cache_key(pdf_path: Path, page_nums: List[int]) -> str:
     """
     Create a stable cache key based on PDF file and page numbers.
@@ -142,6 +196,51 @@ def create_cache_key(pdf_path: Path, page_nums: List[int]) -> str:
     return compute_content_hash(key_data.encode('utf-8'))
 
 
+def group_duplicate_pages(pdf_path: Path, page_nums: List[int]) -> Dict[int, List[int]]:
+    """
+    Group pages whose content is identical so each is OCR'd only once.
+    
+    Two pages are treated as duplicates only when they draw with the same
+    content stream objects, the same image, font and form XObjects, the same
+    page box and rotation, and carry the same annotations. Resources are
+    compared as resolved objects, so pages that share a content stream but
+    name different images or fonts are kept apart, while blank or repeated
+    divider pages still collapse.
+    
+    Args:
+        pdf_path: Path to PDF file
+        page_nums: Page numbers (1-based) to group
+        
+    Returns:
+        Mapping of representative page number to its duplicate page numbers
+    """
+    groups: Dict[str, int] = {}
+    duplicates: Dict[int, List[int]] = {}
+    
+    doc = pymupdf.open(pdf_path)
+    try:
+        for page_num in page_nums:
+            page = doc[page_num - 1]
+            signature = (
+                tuple(page.get_contents()),
+                tuple(sorted((img[0], img[7]) for img in page.get_images(full=True))),
+                tuple(sorted((font[0], font[4]) for font in page.get_fonts(full=True))),
+                tuple(sorted((xobj[0], xobj[1]) for xobj in page.get_xobjects())),
+                tuple(annot.xref for annot in page.annots()),
+                tuple(page.rect),
+                page.rotation,
+            )
+            fingerprint = compute_content_hash(repr(signature).encode("utf-8"))
+            representative = groups.setdefault(fingerprint, page_num)
+            duplicates.setdefault(representative, [])
+            if representative != page_num:
+                duplicates[representative].append(page_num)
+    finally:
+        doc.close()
+    
+    return duplicates
+
+
 # parse_llm_response function removed - no longer needed with single page processing
 
 
@@ -149,7 +248,8 @@ async def ocr_pdf_subset_with_llm(
     pdf_subset_bytes: bytes,
     page_nums: List[int],
     pdf_filename: Optional[str] = None,
-    pdf_path: Optional[Path] = None
+    pdf_path: Optional[Path] = None,
+    pending_cache: Optional[List[tuple]] = None
 ) -> Tuple[str, int, int, str]:
     """
     Perform OCR on a PDF subset using Google GenAI with caching support.
@@ -159,6 +259,8 @@ async def ocr_pdf_subset_with_llm(
         page_nums: The corresponding page numbers
         pdf_filename: The name of the source PDF for debugging/caching
         pdf_path: Path to original PDF (for stable cache key)
+        pending_cache: If given, cache entries are appended here for a later
+            batched write instead of being saved immediately
         
     Returns:
         Tuple of (combined_extracted_text, input_tokens, output_tokens, method)
@@ -190,15 +292,15 @@ async def ocr_pdf_subset_with_llm(
         
         contents = [prompt, pdf_part]
         
+        # Wait for a rate-limit token before hitting the API
+        await rate_limiter.acquire()
+        
         # Make the async API call
         response = await asyncio.wait_for(
             client.aio.models.generate_content(
                 model=OCR_MODEL,
                 contents=contents,
-                config=types.GenerateContentConfig(
-                    temperature=OCR_TEMPERATURE,
-                    max_output_tokens=OCR_MAX_TOKENS  # Only one page
-                )
+                config=OCR_GENERATION_CONFIG
             ),
             timeout=OCR_TIMEOUT
         )
@@ -211,20 +313,17 @@ async def ocr_pdf_subset_with_llm(
         input_tokens = usage.prompt_token_count if usage else 0
         output_tokens = usage.candidates_token_count if usage else 0
         
-        # Save to cache
-        await save_ocr_to_cache(
-            cache_key,
-            extracted_text,
-            input_tokens,
-            output_tokens,
-            pdf_filename,
-            page_nums[0]  # Use first page number for reference
-        )
+        # Save to cache (first page number kept for reference)
+        cache_entry = (cache_key, extracted_text, input_tokens, output_tokens, pdf_filename, page_nums[0])
+        if pending_cache is not None:
+            pending_cache.append(cache_entry)
+        else:
+            await save_ocr_to_cache(*cache_entry)
         
         return extracted_text, input_tokens, output_tokens, "llm"
         
     except Exception as e:
-        print(f"Error in GenAI OCR for pages {page_nums}: {str(e)}")
+        logger.error(f"Error in GenAI OCR for pages {page_nums}: {str(e)}")
         raise e
 
 
@@ -232,7 +331,8 @@ async def process_page_chunk(
     pdf_path: Path,
     page_nums: List[int],
     semaphore: asyncio.Semaphore,
-    pdf_filename: Optional[str] = None
+    pdf_filename: Optional[str] = None,
+    pending_cache: Optional[List[tuple]] = None
 ) -> List[Dict[str, Any]]:
     """
     Process a chunk of pages by creating and sending an in-memory PDF subset.
@@ -242,6 +342,7 @@ async def process_page_chunk(
         page_nums: List of page numbers (1-based) to process as a chunk
         semaphore: Semaphore for rate limiting
         pdf_filename: PDF filename for caching/debugging
+        pending_cache: Optional list collecting cache entries for a batched write
         
     Returns:
         List of dictionaries with page processing results
@@ -249,11 +350,11 @@ async def process_page_chunk(
     async with semaphore:
         try:
             # Create an in-memory PDF with just the required pages
-            pdf_subset_bytes = create_pdf_subset_bytes(pdf_path, page_nums)
+            pdf_subset_bytes = await run_mupdf(create_pdf_subset_bytes, pdf_path, page_nums)
             
             # Perform OCR on the PDF subset
             combined_text, input_tokens, output_tokens, method = await ocr_pdf_subset_with_llm(
-                pdf_subset_bytes, page_nums, pdf_filename, pdf_path
+                pdf_subset_bytes, page_nums, pdf_filename, pdf_path, pending_cache
             )
             
             # Since we process one page at a time, no parsing needed
@@ -288,10 +389,11 @@ async def retry_failed_chunks(
     attempt: int,
     pdf_path: Path,
     semaphore: asyncio.Semaphore,
-    pdf_filename: Optional[str] = None
+    pdf_filename: Optional[str] = None,
+    pending_cache: Optional[List[tuple]] = None
 ) -> List[Dict[str, Any]]:
     """
-    Retry processing failed pages by regrouping them into chunks with exponential backoff.
+    Retry processing failed pages by regrouping them into chunks with jittered exponential backoff.
     
     Args:
         failed_pages: List of failed page results
@@ -299,15 +401,17 @@ async def retry_failed_chunks(
         pdf_path: Path to PDF file
         semaphore: Semaphore for rate limiting
         pdf_filename: PDF filename for caching/debugging
+        pending_cache: Optional list collecting cache entries for a batched write
         
     Returns:
         List of retry results
     """
-    # Exponential backoff delay
-    delay = OCR_RETRY_DELAY_BASE * (2 ** (attempt - 1))
+    # Full-jitter exponential backoff so retried pages don't wake up together
+    # and re-trigger the same rate limit
+    delay = random.uniform(0, OCR_RETRY_DELAY_BASE * (2 ** (attempt - 1)))
     await asyncio.sleep(delay)
     
-    print(f"Retrying {len(failed_pages)} failed pages (attempt {attempt})")
+    logger.info(f"Retrying {len(failed_pages)} failed pages (attempt {attempt})")
     
     # Group failed pages into chunks
     failed_page_nums = sorted([r['page'] for r in failed_pages])
@@ -318,7 +422,7 @@ async def retry_failed_chunks(
     
     # Create retry tasks for chunks
     retry_tasks = [
-        process_page_chunk(pdf_path, chunk, semaphore, pdf_filename)
+        process_page_chunk(pdf_path, chunk, semaphore, pdf_filename, pending_cache)
         for chunk in page_chunks
     ]
     
@@ -352,6 +456,21 @@ async def retry_failed_chunks(
     return processed_results
 
 
+async def flush_pending_cache(pending_cache: List[tuple]) -> None:
+    """
+    Write collected OCR results to the cache and clear the list.
+    
+    The cache is an optimization, so a failed write (e.g. a locked SQLite
+    database) is logged and the OCR results are still returned.
+    """
+    try:
+        await save_ocr_batch_to_cache(pending_cache)
+    except Exception as e:
+        logger.error(f"Error saving {len(pending_cache)} OCR results to cache: {str(e)}")
+    finally:
+        pending_cache.clear()
+
+
 async def process_document_async(
     pdf_path: Path,
     start_page: int,
@@ -386,7 +505,12 @@ async def process_document_async(
     
     # Group pages into chunks
     total_pages = end_page - start_page + 1
-    page_list = list(range(start_page, end_page + 1))
+    
+    # Collapse identical pages so each distinct page is sent only once
+    duplicate_pages = await run_mupdf(
+        group_duplicate_pages, pdf_path, list(range(start_page, end_page + 1))
+    )
+    page_list = sorted(duplicate_pages)
     page_chunks = []
     
     # Process one page at a time
@@ -395,18 +519,24 @@ async def process_document_async(
     
     if progress_callback:
         progress_callback(f"Processing {total_pages} pages (1 page per API call)")
+        if num_api_calls < total_pages:
+            progress_callback(f"Skipping {total_pages - num_api_calls} duplicate pages")
     
     # Create semaphore for rate limiting
     semaphore = asyncio.Semaphore(OCR_CONCURRENT_REQUESTS)
     
+    # Cache writes are collected here and flushed in one transaction per pass
+    pending_cache: List[tuple] = []
+    
     # Process all chunks initially
     chunk_tasks = [
-        process_page_chunk(pdf_path, chunk, semaphore, pdf_filename)
+        process_page_chunk(pdf_path, chunk, semaphore, pdf_filename, pending_cache)
         for chunk in page_chunks
     ]
     
     # Process initial chunks
     chunk_results_list = await asyncio.gather(*chunk_tasks, return_exceptions=True)
+    await flush_pending_cache(pending_cache)
     
     # Flatten results and handle exceptions
     all_results = []
@@ -431,13 +561,22 @@ async def process_document_async(
     # Retry failed pages
     failed_pages = [r for r in all_results if not r["success"]]
     
+    # Speculatively run offline extraction for failed pages on the MuPDF thread
+    # so it overlaps the retry backoff instead of adding a serial tail
+    fallback_task = None
+    if failed_pages:
+        fallback_task = asyncio.create_task(run_mupdf(
+            extract_pages_with_pymupdf_fallback, pdf_path, [r["page"] for r in failed_pages]
+        ))
+    
     for retry_attempt in range(1, OCR_MAX_RETRIES + 1):
         if not failed_pages:
             break
             
         retry_results = await retry_failed_chunks(
-            failed_pages, retry_attempt, pdf_path, semaphore, pdf_filename
+            failed_pages, retry_attempt, pdf_path, semaphore, pdf_filename, pending_cache
         )
+        await flush_pending_cache(pending_cache)
         
         # Update results and prepare for next retry
         successful_retries = []
@@ -465,9 +604,18 @@ async def process_document_async(
         if progress_callback:
             progress_callback(f"Applying offline extraction to {len(final_failed_pages)} pages")
         
+        try:
+            fallback_texts = await fallback_task
+        except Exception:
+            fallback_texts = {}
+        
         for failed_result in final_failed_pages:
             try:
-                fallback_text = extract_with_pymupdf_fallback(pdf_path, failed_result["page"])
+                fallback_text = fallback_texts.get(failed_result["page"])
+                if fallback_text is None:
+                    fallback_text = await run_mupdf(
+                        extract_with_pymupdf_fallback, pdf_path, failed_result["page"]
+                    )
                 failed_result.update({
                     "text": fallback_text,
                     "method": "pymupdf_fallback",
@@ -476,6 +624,24 @@ async def process_document_async(
                 })
             except Exception as e:
                 failed_result["error"] = f"Fallback failed: {str(e)}"
+    elif fallback_task:
+        # Every page recovered on retry; the speculative extraction is unused.
+        # Await it anyway so a failure is retrieved rather than logged as
+        # "Task exception was never retrieved".
+        fallback_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await fallback_task
+    
+    # Fan results out to duplicate pages (no extra tokens were spent on them)
+    for result in list(all_results):
+        for duplicate_page in duplicate_pages.get(result["page"], []):
+            all_results.append({
+                **result,
+                "page": duplicate_page,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "retry_count": 0
+            })
     
     # Sort results by page number
     all_results.sort(key=lambda x: x["page"])
@@ -628,15 +794,14 @@ async def ocr_image_file(
         if progress_callback:
             progress_callback(f"Sending image to LLM for OCR...")
 
+        await rate_limiter.acquire()
+
         # Make the async API call
         response = await asyncio.wait_for(
             client.aio.models.generate_content(
                 model=OCR_MODEL,
                 contents=contents,
-                config=types.GenerateContentConfig(
-                    temperature=OCR_TEMPERATURE,
-                    max_output_tokens=OCR_MAX_TOKENS
-                )
+                config=OCR_GENERATION_CONFIG
             ),
             timeout=OCR_TIMEOUT
         )
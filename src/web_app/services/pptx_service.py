@@ -1,23 +1,45 @@
 """LibreOffice-based PPTX/PPT → PDF conversion service."""
 
 import asyncio
+import os
+import shutil
 import subprocess
 import tempfile
+import uuid
 from pathlib import Path
 
-from pdf_utils.config import LIBREOFFICE_TIMEOUT
+from pdf_utils.config import LIBREOFFICE_TIMEOUT, LIBREOFFICE_PROFILE_DIR
 
+# soffice instances sharing one user profile must not run concurrently
+_soffice_lock = asyncio.Lock()
 
-async def convert_pptx_to_pdf_bytes(pptx_bytes: bytes, filename: str) -> bytes:
-    """Save PPTX/PPT to a temp dir, convert to PDF via LibreOffice, return PDF bytes."""
+
+async def convert_pptx_to_pdf(pptx_bytes: bytes, filename: str, dest: Path) -> None:
+    """Convert PPTX/PPT bytes to PDF via LibreOffice and write the PDF to dest."""
+    async with _soffice_lock:
+        await _run_soffice_conversion(pptx_bytes, filename, dest)
+
+
+async def _run_soffice_conversion(pptx_bytes: bytes, filename: str, dest: Path) -> None:
+    """Save PPTX/PPT to a temp dir, convert to PDF via LibreOffice, move the PDF to dest."""
     with tempfile.TemporaryDirectory() as tmp:
         tmp_path = Path(tmp)
         src = tmp_path / filename
         src.write_bytes(pptx_bytes)
 
+        # A persistent profile lets soffice skip first-start profile creation,
+        # which dominates cold-start time for small decks
+        LIBREOFFICE_PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        profile_uri = LIBREOFFICE_PROFILE_DIR.resolve().as_uri()
+
+        # Callers hold _soffice_lock for the duration of this call
         result = await asyncio.to_thread(
             subprocess.run,
-            ["soffice", "--headless", "--convert-to", "pdf", "--outdir", tmp, str(src)],
+            [
+                "soffice", f"-env:UserInstallation={profile_uri}",
+                "--headless", "--norestore", "--nologo", "--nofirststartwizard",
+                "--convert-to", "pdf", "--outdir", tmp, str(src),
+            ],
             timeout=LIBREOFFICE_TIMEOUT,
             capture_output=True,
             text=True,
@@ -28,4 +50,10 @@ async def convert_pptx_to_pdf_bytes(pptx_bytes: bytes, filename: str) -> bytes:
         pdf_path = tmp_path / (Path(filename).stem + ".pdf")
         if not pdf_path.exists():
             raise FileNotFoundError("LibreOffice produced no output PDF")
-        return pdf_path.read_bytes()
+
+        # Move (not read) the output into place, then publish atomically so
+        # concurrent readers never see a partial PDF
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dest = dest.with_name(f"{dest.name}.{uuid.uuid4().hex}.tmp")
+        await asyncio.to_thread(shutil.move, pdf_path, tmp_dest)
+        os.replace(tmp_dest, dest)
@@ -21,6 +21,7 @@ from pdf_utils.config import (
     OCR_TIMEOUT,
     OCR_TEMPERATURE,
 )
+from web_app.services.pdf_service import run_mupdf
 
 load_dotenv()
 
@@ -257,6 +258,33 @@ def _load_quality_prompt() -> str:
         )
 
 
+def _sample_pdf_text(pdf_bytes: bytes) -> str:
+    """
+    Extract text from the first 2 pages with PyMuPDF (fast, no API cost),
+    stopping as soon as the 3000-char sample cap is reached.
+    """
+    doc = pymupdf.open(stream=pdf_bytes, filetype="pdf")
+    pages_to_check = min(2, len(doc))
+    sample_parts = []
+    sample_len = 0
+    for i in range(pages_to_check):
+        page_text = doc[i].get_text()
+        sample_parts.append(page_text)
+        sample_len += len(page_text) + 1
+        if sample_len >= 3000:
+            break
+    doc.close()
+    return "\n".join(sample_parts)[:3000].strip()  # cap at 3000 chars
+
+
+def _count_pages(pdf_path: Path) -> int:
+    """Return the number of pages in a PDF file."""
+    doc = pymupdf.open(str(pdf_path))
+    page_count = len(doc)
+    doc.close()
+    return page_count
+
+
 async def check_pdf_quality(pdf_bytes: bytes) -> tuple[str, str]:
     """
     Extract text from first 2 pages of the PDF and ask the LLM to assess quality.
@@ -268,15 +296,8 @@ async def check_pdf_quality(pdf_bytes: bytes) -> tuple[str, str]:
     if _client is None:
         return "UNKNOWN", "No API key configured for quality check."
 
-    # Extract text from first 2 pages with PyMuPDF (fast, no API cost)
     try:
-        doc = pymupdf.open(stream=pdf_bytes, filetype="pdf")
-        pages_to_check = min(2, len(doc))
-        sample_text = ""
-        for i in range(pages_to_check):
-            sample_text += doc[i].get_text() + "\n"
-        doc.close()
-        sample_text = sample_text[:3000].strip()  # cap at 3000 chars
+        sample_text = await run_mupdf(_sample_pdf_text, pdf_bytes)
     except Exception:
         return "UNKNOWN", "Could not extract text for quality check."
 
@@ -373,9 +394,7 @@ async def extract_url_via_pdf_ocr(url: str) -> UrlPdfOcrResult:
 
     try:
         # Get page count
-        doc = pymupdf.open(str(pdf_path))
-        page_count = len(doc)
-        doc.close()
+        page_count = await run_mupdf(_count_pages, pdf_path)
 
         if page_count == 0:
             pdf_path.unlink(missing_ok=True)
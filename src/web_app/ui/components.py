@@ -1,7 +1,12 @@
 """UI components for the web application."""
 
+from functools import lru_cache
 from fasthtml.common import *
-from pdf_utils.config import MAX_FILE_SIZE_MB
+from html import escape as html_escape
+from pdf_utils.config import (
+    MAX_FILE_SIZE_MB, GALLERY_PAGES_PER_BATCH, TOC_ITEMS_PER_BATCH, TEXT_PREVIEW_CHARS,
+    UPLOAD_POLL_DELAYS,
+)
 
 
 # ── Upload ──────────────────────────────────────────────────────────────────
@@ -13,7 +18,13 @@ def upload_form():
     HTMX listens for `change` on the hidden input and posts as multipart/form-data.
     The label is a plain inline-block so flexbox centers it perfectly under the icon.
     """
-    return Div(
+    # Static markup: build and serialize it once per process
+    return NotStr(_upload_form_html())
+
+
+@lru_cache(maxsize=1)
+def _upload_form_html() -> str:
+    return to_xml(Div(
         Form(
             # ── Upload card ───────────────────────────────────────────────
             Div(
@@ -48,33 +59,37 @@ def upload_form():
         ),
         Div(id="upload-result"),
         cls="upload-section",
-    )
+    ))
 
 
-def upload_progress_poll(task_id: str):
+def upload_progress_poll(task_id: str, phase: str = "Saving file…", pct: int = 10, n: int = 0):
     """Polling container returned immediately after POST /upload.
 
-    Self-replaces every 250 ms via hx-trigger until the server
-    signals completion (at which point the final content has no
-    polling attributes and the loop stops automatically).
+    Each poll fires once on load after a delay taken from UPLOAD_POLL_DELAYS,
+    so polling starts fast and backs off for long uploads; `n` counts the
+    polls made so far. The final content has no polling attributes, which
+    stops the loop automatically.
     """
+    delay = UPLOAD_POLL_DELAYS[min(n, len(UPLOAD_POLL_DELAYS) - 1)]
     return Div(
-        _progress_bar("Saving file…", 10),
+        _progress_bar(phase, pct),
         id="upload-poll",
-        hx_get=f"/upload-status/{task_id}",
-        hx_trigger="every 250ms",
+        hx_get=f"/upload-status/{task_id}?n={n + 1}",
+        hx_trigger=f"load delay:{delay}",
         hx_target="this",
         hx_swap="outerHTML",
     )
 
 
-def upload_progress_status(phase: str, pct: int):
-    """Progress bar used inside the polling container."""
-    return _progress_bar(phase, pct)
+def _progress_bar(label: str, pct: int):
+    # Upload phases are a handful of fixed (label, pct) steps and repeat on
+    # every poll, so each bar is rendered once and reused
+    return NotStr(_progress_bar_html(label, pct))
 
 
-def _progress_bar(label: str, pct: int):
-    return Div(
+@lru_cache(maxsize=64)
+def _progress_bar_html(label: str, pct: int) -> str:
+    return to_xml(Div(
         Div(
             Span(cls="spinner"),
             Span(label),
@@ -85,53 +100,41 @@ def _progress_bar(label: str, pct: int):
             cls="progress-track",
         ),
         cls="upload-progress",
-    )
+    ))
 
 
-# ── Page wrapper ────────────────────────────────────────────────────────────
+# ── File info ────────────────────────────────────────────────────────────────
 
-def page_with_result(result_content):
-    """Full page - kept for backward compatibility in error paths."""
-    return Titled("PDF & Image Utilities",
-        Div(
-            Div(
-                H1("PDF & Image Utilities", cls="page-title"),
-                P("Upload a PDF or image to use processing tools.",
-                  cls="page-subtitle"),
-                cls="page-header",
-            ),
-            upload_form(),
-            result_content,
-            cls="app-wrap",
-        )
-    )
+def _pill(text: str):
+    """Small rounded label; rendered straight to a string (pages show several)."""
+    return NotStr(f'<span class="pill">{html_escape(text)}</span>')
 
 
-# ── File info ────────────────────────────────────────────────────────────────
+def _metric_box(label: str, value: str):
+    # Labels are static and values are formatted numbers: nothing to escape
+    return NotStr(f'<div class="metric-box"><p class="metric-label">{label}</p>'
+                  f'<p class="metric-value">{value}</p></div>')
+
 
 def file_info_display(file_info, is_existing=False):
-    """Compact pill-based file info card."""
+    """Compact pill-based file info card, rendered as a single string."""
     is_pdf = file_info.file_type == "pdf"
     icon   = "📄" if is_pdf else "🖼"
     label  = "PDF" if is_pdf else "Image"
     size   = f"{file_info.file_size / 1024 / 1024:.1f} MB"
+    pages  = f'<span class="pill">{file_info.page_count} pages</span>' if is_pdf else ""
 
-    pills = [
-        Span(f"{icon} {label}", cls="pill"),
-        Span(size, cls="pill"),
-    ]
-    if is_pdf:
-        pills.append(Span(f"{file_info.page_count} pages", cls="pill"))
-
-    status_msg = "Uploaded" if not is_existing else "Already cached – instant load"
-    status_cls = "alert-success" if not is_existing else "alert-warning"
-
-    return Div(
-        P(file_info.original_filename, cls="file-name"),
-        Div(*pills, cls="file-meta"),
-        P(status_msg, cls=status_cls),
-        cls="card",
-        style="margin-bottom:0.75rem;",
+    if is_existing:
+        status = '<p class="alert-warning">Already cached – instant load</p>'
+    else:
+        status = '<p class="alert-success">Uploaded</p>'
+
+    return NotStr(
+        f'<div class="card" style="margin-bottom:0.75rem;">'
+        f'<p class="file-name">{html_escape(file_info.original_filename)}</p>'
+        f'<div class="file-meta"><span class="pill">{icon} {label}</span>'
+        f'<span class="pill">{size}</span>{pages}</div>'
+        f'{status}</div>'
     )
 
 
@@ -139,8 +142,18 @@ def file_info_display(file_info, is_existing=False):
 
 def operation_buttons(file_hash, file_type="pdf"):
     """Responsive CSS-grid of operation buttons with icon + label."""
+    # Serialize once per file type with a placeholder; the hash is a hex
+    # digest, so substituting it needs no escaping
+    return NotStr(_operation_buttons_html(file_type).replace(_HASH_SLOT, file_hash))
+
+
+_HASH_SLOT = "__FILE_HASH__"
+
+
+@lru_cache(maxsize=2)
+def _operation_buttons_html(file_type: str, file_hash: str = _HASH_SLOT) -> str:
     if file_type == "image":
-        return Div(
+        return to_xml(Div(
             H3("Operations"),
             Div(
                 _op_btn("🤖", "OCR",
@@ -150,9 +163,9 @@ def operation_buttons(file_hash, file_type="pdf"):
                 cls="ops-grid",
             ),
             Div(id="operation-result"),
-        )
+        ))
 
-    return Div(
+    return to_xml(Div(
         H3("Operations"),
         Div(
             _op_btn("🤖", "OCR",
@@ -182,7 +195,7 @@ def operation_buttons(file_hash, file_type="pdf"):
             cls="ops-grid",
         ),
         Div(id="operation-result"),
-    )
+    ))
 
 
 def _op_btn(icon: str, label: str, extra_cls: str = "", **htmx_attrs):
@@ -200,7 +213,13 @@ def _op_btn(icon: str, label: str, extra_cls: str = "", **htmx_attrs):
 
 def url_input_form():
     """URL input section — card below the file upload."""
-    return Div(
+    # Static markup, like upload_form: build and serialize it once per process
+    return NotStr(_url_input_form_html())
+
+
+@lru_cache(maxsize=1)
+def _url_input_form_html() -> str:
+    return to_xml(Div(
         # ── divider ──────────────────────────────────────────────────────
         Div(
             Div(cls="or-line"),
@@ -307,7 +326,7 @@ def url_input_form():
             style="margin-top:0.75rem;",
         ),
         Div(id="url-pdf-result"),
-    )
+    ))
 
 
 def url_result_display(result, md_filename: str, file_content: str):
@@ -322,21 +341,9 @@ def url_result_display(result, md_filename: str, file_content: str):
         ),
         # ── metrics ──────────────────────────────────────────────────────
         Div(
-            Div(
-                P("Characters", cls="metric-label"),
-                P(f"{result.char_count:,}", cls="metric-value"),
-                cls="metric-box",
-            ),
-            Div(
-                P("Words", cls="metric-label"),
-                P(f"{result.word_count:,}", cls="metric-value"),
-                cls="metric-box",
-            ),
-            Div(
-                P("Time", cls="metric-label"),
-                P(f"{result.processing_time:.1f}s", cls="metric-value"),
-                cls="metric-box",
-            ),
+            _metric_box("Characters", f"{result.char_count:,}"),
+            _metric_box("Words", f"{result.word_count:,}"),
+            _metric_box("Time", f"{result.processing_time:.1f}s"),
             cls="metrics-row",
             style="margin-bottom:0.875rem;",
         ),
@@ -346,24 +353,14 @@ def url_result_display(result, md_filename: str, file_content: str):
                 "⬇ Download .md",
                 href=f"/{md_filename}",
                 download=md_filename,
-                cls="button",
-                style="background:var(--green);",
-            ),
-            Button(
-                "📋 Copy",
-                onclick=(
-                    f"const t=document.getElementById('{preview_id}').textContent;"
-                    f"navigator.clipboard.writeText(t).then(()=>{{"
-                    f"this.textContent='✅ Copied!';this.style.background='var(--green)';"
-                    f"setTimeout(()=>{{this.textContent='📋 Copy';this.style.background='';}},2000);}});"
-                ),
-                cls="button",
+                cls="button btn-green",
             ),
+            copy_file_button(md_filename),
             cls="action-row",
         ),
         # ── preview (shows the full file content with source header/footer) ──
         H4("Preview"),
-        Pre(file_content, id=preview_id, cls="text-preview"),
+        Pre(*preview_text(file_content, md_filename), id=preview_id, cls="text-preview"),
         cls="result-area",
     )
 
@@ -407,26 +404,10 @@ def url_pdf_ocr_result_display(result, txt_filename: str, file_content: str):
         ),
         # ── metrics ──────────────────────────────────────────────────────
         Div(
-            Div(
-                P("Pages", cls="metric-label"),
-                P(str(result.page_count), cls="metric-value"),
-                cls="metric-box",
-            ),
-            Div(
-                P("Characters", cls="metric-label"),
-                P(f"{result.char_count:,}", cls="metric-value"),
-                cls="metric-box",
-            ),
-            Div(
-                P("Words", cls="metric-label"),
-                P(f"{result.word_count:,}", cls="metric-value"),
-                cls="metric-box",
-            ),
-            Div(
-                P("Time", cls="metric-label"),
-                P(f"{result.processing_time:.1f}s", cls="metric-value"),
-                cls="metric-box",
-            ),
+            _metric_box("Pages", str(result.page_count)),
+            _metric_box("Characters", f"{result.char_count:,}"),
+            _metric_box("Words", f"{result.word_count:,}"),
+            _metric_box("Time", f"{result.processing_time:.1f}s"),
             cls="metrics-row",
             style="margin-bottom:0.5rem;",
         ),
@@ -446,34 +427,21 @@ def url_pdf_ocr_result_display(result, txt_filename: str, file_content: str):
                 "⬇ Download .txt",
                 href=f"/{txt_filename}",
                 download=txt_filename,
-                cls="button",
-                style="background:var(--purple);",
-            ),
-            Button(
-                "📋 Copy",
-                onclick=(
-                    f"const btn=this;"
-                    f"fetch('/{txt_filename}')"
-                    f".then(r=>r.text())"
-                    f".then(t=>navigator.clipboard.writeText(t))"
-                    f".then(()=>{{"
-                    f"btn.textContent='✅ Copied!';btn.style.background='var(--green)';"
-                    f"setTimeout(()=>{{btn.textContent='📋 Copy';btn.style.background='';}},2000);}});"
-                ),
-                cls="button",
+                cls="button btn-purple",
             ),
+            copy_file_button(txt_filename),
             cls="action-row",
         ),
         # ── preview ───────────────────────────────────────────────────────
         H4("Preview"),
-        Pre(file_content, id=preview_id, cls="text-preview"),
+        Pre(*preview_text(file_content, txt_filename), id=preview_id, cls="text-preview"),
         cls="result-area",
     )
 
 
 # ── TOC ──────────────────────────────────────────────────────────────────────
 
-def toc_display(toc):
+def toc_display(toc, file_hash):
     if not toc:
         return Div(
             H3("Table of Contents"),
@@ -481,26 +449,55 @@ def toc_display(toc):
             cls="result-area",
         )
 
-    items = []
-    for level, title, page in toc:
-        level_cls = f"toc-l{min(level, 3)}"
-        bold = "font-weight:700;" if level == 0 else ""
-        items.append(
-            Li(
-                Span(title, cls="toc-title"),
-                Span(f"p. {page}", cls="toc-page"),
-                cls=f"toc-item {level_cls}",
-                style=bold,
-            )
-        )
-
     return Div(
         H3("Table of Contents"),
-        Ul(*items, cls="toc-list"),
+        Ul(toc_items_batch(toc, file_hash), cls="toc-list"),
         cls="result-area",
     )
 
 
+def toc_items_batch(toc, file_hash, offset=0):
+    """TOC_ITEMS_PER_BATCH entries starting at offset, plus a load-more sentinel if any remain.
+
+    The sentinel is an Li so the batch it fetches lands inside the same list.
+    """
+    # A file's TOC never changes, so render each distinct batch to HTML once
+    return NotStr(_render_toc_items_html(
+        tuple((level, title, page) for level, title, page in toc), file_hash, offset
+    ))
+
+
+# Opening <li> tag per TOC level, built once instead of per entry
+# (level styling lives in the .toc-l* classes)
+_TOC_ITEM_OPEN = {level: f'<li class="toc-item toc-l{min(level, 3)}">' for level in range(16)}
+
+
+def _render_toc_row(level: int, title: str, page: int) -> str:
+    """One TOC entry as an HTML string; only the title needs escaping."""
+    return (f'{_TOC_ITEM_OPEN.get(level) or _TOC_ITEM_OPEN[15]}'
+            f'<span class="toc-title">{html_escape(title)}</span>'
+            f'<span class="toc-page">p. {page}</span></li>')
+
+
+@lru_cache(maxsize=256)
+def _render_toc_items_html(toc: tuple, file_hash: str, offset: int) -> str:
+    next_offset = offset + TOC_ITEMS_PER_BATCH
+    # Leaf rows go straight to strings: no FT tree to build and walk again
+    items = [_render_toc_row(level, title, page)
+             for level, title, page in toc[offset:next_offset]]
+
+    if next_offset < len(toc):
+        items.append(to_xml(
+            Li(
+                hx_get=f"/toc-page/{file_hash}/{next_offset}",
+                hx_trigger="revealed",
+                hx_swap="outerHTML",
+            )
+        ))
+
+    return "".join(items)
+
+
 # ── Chapters ────────────────────────────────────────────────────────────────
 
 def chapters_form_display(chapters, file_hash):
@@ -521,43 +518,34 @@ def chapters_form_display(chapters, file_hash):
         rows.append(
             Label(
                 Input(type="checkbox", name="chapters", value=str(ch["index"]),
-                      checked=True, cls="ch-cb",
-                      style="width:1.1rem;height:1.1rem;cursor:pointer;"),
-                Span(f'{ch["index"]}.', style="font-weight:600;min-width:1.5rem;"),
-                Span(ch["title"], style="flex:1;"),
+                      checked=True, cls="ch-cb"),
+                Span(f'{ch["index"]}.', cls="ch-index"),
+                Span(ch["title"], cls="ch-title"),
                 Span(f'pp. {ch["start_page"]}–{ch["end_page"]}  ({pg_count} pg)',
                      cls="toc-page"),
-                style="display:flex;gap:.5rem;align-items:center;padding:.35rem 0;cursor:pointer;",
+                cls="ch-row",
             )
         )
 
-    toggle_js = (
-        "let cbs=this.closest('form').querySelectorAll('.ch-cb');"
-        "let allChecked=[...cbs].every(c=>c.checked);"
-        "cbs.forEach(c=>c.checked=!allChecked);"
-        "this.textContent=allChecked?'Select All':'Deselect All';"
-    )
-
     return Div(
         H3("Download Chapters"),
         Div(
-            Span(f"{len(chapters)} chapters", cls="pill"),
-            Span(f"{total_pages} pages total", cls="pill"),
-            Span("OCR · one .md per chapter · ZIP", cls="pill"),
-            cls="file-meta", style="margin-bottom:.75rem;",
+            _pill(f"{len(chapters)} chapters"),
+            _pill(f"{total_pages} pages total"),
+            _pill("OCR · one .md per chapter · ZIP"),
+            cls="file-meta spaced",
         ),
         Form(
             Div(
                 Button("Deselect All", type="button",
-                       onclick=toggle_js,
-                       cls="button",
-                       style="font-size:.78rem;padding:.3rem .7rem;"),
-                style="margin-bottom:.5rem;",
+                       data_action="toggle-chapters",
+                       cls="button btn-small"),
+                cls="ch-toolbar",
             ),
-            Div(*rows, style="display:flex;flex-direction:column;gap:0;"),
+            Div(*rows, cls="ch-list"),
             Div(
                 Button("Download Selected Chapters (OCR)", type="submit",
-                       style="background:var(--orange);margin-top:.75rem;"),
+                       cls="btn-orange ch-submit"),
                 Span(Span(cls="spinner"), " Running OCR on selected chapters…",
                      id="chapters-indicator", cls="htmx-indicator"),
                 cls="action-row",
@@ -583,31 +571,27 @@ def chapters_result_display(chapter_results, zip_filename, total_time):
     items = []
     for r in chapter_results:
         status = "✅" if r.get("ok") else "❌"
-        items.append(
-            Li(f'{status} {r["title"]}  —  {r.get("pages", 0)} pg',
-               style="font-size:.85rem;")
-        )
+        items.append(Li(f'{status} {r["title"]}  —  {r.get("pages", 0)} pg'))
 
     return Div(
         H3("Chapters — OCR Complete"),
         Div(
-            Span(f"{ok_chapters}/{total_chapters} chapters", cls="pill"),
-            Span(f"{total_pages} pages", cls="pill"),
-            Span(f"{total_time:.1f}s", cls="pill"),
-            Span(f"cache {cache_pct:.0f}%", cls="pill"),
-            cls="file-meta", style="margin-bottom:.75rem;",
+            _pill(f"{ok_chapters}/{total_chapters} chapters"),
+            _pill(f"{total_pages} pages"),
+            _pill(f"{total_time:.1f}s"),
+            _pill(f"cache {cache_pct:.0f}%"),
+            cls="file-meta spaced",
         ),
         Div(
             Span(f"Tokens — in: {total_input:,}  out: {total_output:,}",
-                 style="font-size:.82rem;color:var(--text-muted);"),
+                 cls="muted-note"),
         ),
-        Ul(*items, style="margin:.75rem 0;"),
+        Ul(*items, cls="ch-results"),
         Div(
             A("⬇ Download ZIP",
               href=f"/{zip_filename}",
               download=zip_filename,
-              cls="button",
-              style="background:var(--orange);"),
+              cls="button btn-orange"),
             cls="action-row",
         ),
         cls="result-area",
@@ -628,6 +612,34 @@ def warning_message(message):
     return P(message, cls="warning")
 
 
+# ── Text results ─────────────────────────────────────────────────────────────
+
+def copy_file_button(filename: str):
+    """Copy button that fetches the saved text file instead of reading the preview DOM.
+
+    Handled by the shared `copy-file` action in APP_JS.
+    """
+    return Button("📋 Copy", data_action="copy-file", data_url=f"/{filename}",
+                  cls="button")
+
+
+def preview_text(text: str, filename: str):
+    """Children for a text-preview <pre>: the first TEXT_PREVIEW_CHARS inline.
+
+    Longer text ends with a sentinel that loads the rest of the saved file
+    via HTMX once the end of the preview is scrolled into view.
+    """
+    if len(text) <= TEXT_PREVIEW_CHARS:
+        return (text,)
+    return (
+        text[:TEXT_PREVIEW_CHARS],
+        Span("…",
+             hx_get=f"/text-tail/{filename}",
+             hx_trigger="intersect once",
+             hx_swap="outerHTML"),
+    )
+
+
 # ── Image gallery ─────────────────────────────────────────────────────────────
 
 def image_extraction_gallery(images_data, file_hash, start_page, end_page):
@@ -638,69 +650,121 @@ def image_extraction_gallery(images_data, file_hash, start_page, end_page):
             cls="result-area",
         )
 
-    gallery_elements = []
-    total_images = 0
+    total_images = sum(len(page_images) for page_images in images_data.values())
+
+    return Div(
+        H3("Extracted Images"),
+        Div(
+            _pill(f"{total_images} images from pages {start_page}–{end_page}"),
+            cls="file-meta spaced",
+        ),
+        P("Click any image to download it", cls="muted-note gallery-hint"),
+        Div(
+            # The archive streams, so a plain link starts the download immediately
+            A("⬇ Download All as ZIP",
+              href=f"/download-image-zip/{file_hash}/{start_page}/{end_page}",
+              cls="button"),
+            cls="action-row",
+        ),
+        Div(*image_gallery_batch(images_data, file_hash, start_page, end_page),
+            cls="image-gallery-container"),
+        cls="result-area",
+    )
 
-    for page_num in sorted(images_data.keys()):
-        page_images = images_data[page_num]
-        if not page_images:
-            continue
 
+def image_gallery_batch(images_data, file_hash, start_page, end_page, offset=0):
+    """Gallery sections for the next GALLERY_PAGES_PER_BATCH PDF pages that have images.
+
+    If more pages remain, a sentinel is appended that fetches the next batch
+    via HTMX when scrolled into view and replaces itself with it.
+    """
+    # The extractor builds images_data in page order, so no sort is needed
+    pages = [item for item in images_data.items() if item[1]]
+    next_offset = offset + GALLERY_PAGES_PER_BATCH
+    url_prefix = f"/extracted-image/{file_hash}/{start_page}/{end_page}/"
+    thumb_prefix = f"/extracted-thumb/{file_hash}/{start_page}/{end_page}/"
+
+    gallery_elements = []
+    for page_num, page_images in pages[offset:next_offset]:
         gallery_elements.append(
             Div(f"Page {page_num}", cls="page-separator")
         )
 
-        image_items = []
-        for img_data in page_images:
-            total_images += 1
-            image_items.append(
-                Div(
-                    A(
-                        Img(
-                            src=img_data["data"],
-                            alt=img_data["filename"],
-                            cls="image-thumbnail",
-                        ),
-                        href=img_data["data"],
-                        download=img_data["filename"],
-                        title=f"Download {img_data['filename']}",
-                    ),
-                    cls="image-item",
-                )
-            )
+        # One string per page grid; only the filename needs escaping
+        image_items = "".join(
+            _render_gallery_item(f"{url_prefix}{page_num}/{image_index}",
+                                 f"{thumb_prefix}{page_num}/{image_index}",
+                                 img_data["filename"])
+            for image_index, img_data in enumerate(page_images)
+        )
+        gallery_elements.append(
+            Div(NotStr(image_items), cls="image-extraction-grid")
+        )
 
+    if next_offset < len(pages):
         gallery_elements.append(
-            Div(*image_items, cls="image-extraction-grid")
+            Div(
+                hx_get=f"/extracted-image-gallery/{file_hash}/{start_page}/{end_page}/{next_offset}",
+                hx_trigger="revealed",
+                hx_swap="outerHTML",
+            )
         )
 
+    return gallery_elements
+
+
+def _render_gallery_item(image_url: str, thumb_url: str, filename: str) -> str:
+    # The grid shows the downscaled thumbnail; the link keeps the full image
+    filename = html_escape(filename, quote=True)
+    return (f'<div class="image-item"><a href="{image_url}" download="{filename}" '
+            f'title="Download {filename}"><img src="{thumb_url}" alt="{filename}" '
+            f'loading="lazy" decoding="async" class="image-thumbnail"></a></div>')
+
+
+# ── OCR result ───────────────────────────────────────────────────────────────
+
+def ocr_progress_shell(task_id: str):
+    """Initial OCR status: a self-refreshing poll plus a live log it appends to."""
+    return Div(
+        ocr_progress_poll(task_id, "Starting OCR…"),
+        Ul(id="ocr-live-log", cls="ocr-log"),
+    )
+
+
+def ocr_progress_poll(task_id: str, message: str, since: int = 0):
+    """Self-refreshing OCR status shown while the background task runs.
+
+    `since` is how many progress messages the page already has, so each
+    poll only carries new ones. Replaced by the full ocr_result_display
+    once the task is done.
+    """
     return Div(
-        H3("Extracted Images"),
-        Div(
-            Span(f"{total_images} images from pages {start_page}–{end_page}",
-                 cls="pill"),
-            cls="file-meta",
-            style="margin-bottom:0.75rem;",
-        ),
-        P("Click any image to download it",
-          style="font-size:0.8rem; color:var(--text-muted); margin-bottom:0.5rem;"),
         Div(
-            Button(
-                "⬇ Download All as ZIP",
-                onclick=(
-                    f"this.textContent='Preparing…'; this.disabled=true;"
-                    f"window.location.href='/download-image-zip/{file_hash}/{start_page}/{end_page}';"
-                    f"setTimeout(()=>{{this.textContent='⬇ Download All as ZIP';this.disabled=false;}},2000);"
-                ),
-                cls="button",
-            ),
-            cls="action-row",
+            Span(cls="spinner"),
+            Span(message),
+            cls="progress-phase",
         ),
-        Div(*gallery_elements, cls="image-gallery-container"),
-        cls="result-area",
+        cls="upload-progress",
+        hx_get=f"/ocr-status/{task_id}?since={since}",
+        hx_trigger="every 1s",
+        hx_target="this",
+        hx_swap="outerHTML",
     )
 
 
-# ── OCR result ───────────────────────────────────────────────────────────────
+def ocr_progress_log(messages):
+    """Out-of-band append of new progress messages to the live log."""
+    return Ul(*[Li(m) for m in messages], id="ocr-live-log", hx_swap_oob="beforeend")
+
+
+# Per-page method -> (icon, colour class), built once; one lookup per row
+_OCR_METHOD_META = {
+    "Cached":           ("💾", "pd-cached"),
+    "LLM OCR":          ("🤖", "pd-llm"),
+    "PyMuPDF Fallback": ("📄", "pd-fallback"),
+}
+_OCR_METHOD_FAILED = ("❌", "pd-failed")
+
 
 def ocr_result_display(results, file_hash, start_page, end_page, text_filename):
     preview_id = f"ocr-preview-{file_hash}-{start_page}-{end_page}"
@@ -716,61 +780,50 @@ def ocr_result_display(results, file_hash, start_page, end_page, text_filename):
 
     # ── metrics boxes ──────────────────────────────────────────────────────
     metrics = Div(
-        Div(
-            P("⏱ Time", cls="metric-label"),
-            P(f"{proc_time:.1f}s", cls="metric-value"),
-            cls="metric-box",
-        ),
-        Div(
-            P("💾 Cache", cls="metric-label"),
-            P(f"{cache_rate:.0f}%", cls="metric-value"),
-            cls="metric-box",
-        ),
-        Div(
-            P("🔤 Input tok", cls="metric-label"),
-            P(f"{in_tok:,}", cls="metric-value"),
-            cls="metric-box",
-        ),
-        Div(
-            P("🔤 Output tok", cls="metric-label"),
-            P(f"{out_tok:,}", cls="metric-value"),
-            cls="metric-box",
-        ),
+        *[_metric_box(label, value) for label, value in (
+            ("⏱ Time",       f"{proc_time:.1f}s"),
+            ("💾 Cache",      f"{cache_rate:.0f}%"),
+            ("🔤 Input tok",  f"{in_tok:,}"),
+            ("🔤 Output tok", f"{out_tok:,}"),
+        )],
         cls="metrics-row",
     )
 
     # ── per-page detail list ───────────────────────────────────────────────
-    page_items = []
+    # One <li> string per page, joined once (long reports have hundreds)
     if "processing_details" in results:
+        parts = []
+        append = parts.append
         for d in results["processing_details"]:
             m = d["method"]
-            icon  = {"Cached": "💾", "LLM OCR": "🤖", "PyMuPDF Fallback": "📄"}.get(m, "❌")
-            color = {"Cached": "#17a2b8", "LLM OCR": "#16a34a",
-                     "PyMuPDF Fallback": "#ea580c"}.get(m, "#dc2626")
+            icon, cls = _OCR_METHOD_META.get(m, _OCR_METHOD_FAILED)
             tok = d["tokens"]["input"] + d["tokens"]["output"]
             tok_txt = f" · {tok:,} tok" if tok else ""
             retry_txt = f" (retry {d['retry_count']})" if d.get("retry_count") else ""
-            page_items.append(Li(
-                f"{icon} Page {d['page']}: {m}{retry_txt}{tok_txt}",
-                style=f"color:{color}",
-            ))
+            append(f'<li class="{cls}">'
+                   f'{icon} Page {d["page"]}: {html_escape(m)}{retry_txt}{tok_txt}</li>')
     else:
-        for p in cached_pages:
-            page_items.append(Li(f"💾 Page {p}: Cached",        style="color:#17a2b8"))
-        for p in llm_pages:
-            page_items.append(Li(f"🤖 Page {p}: LLM OCR",       style="color:#16a34a"))
-        for p in fallback_pages:
-            page_items.append(Li(f"📄 Page {p}: PyMuPDF",       style="color:#ea580c"))
+        parts = [f'<li class="pd-cached">💾 Page {p}: Cached</li>' for p in cached_pages]
+        parts += [f'<li class="pd-llm">🤖 Page {p}: LLM OCR</li>' for p in llm_pages]
+        parts += [f'<li class="pd-fallback">📄 Page {p}: PyMuPDF</li>' for p in fallback_pages]
+    page_items = NotStr("".join(parts))
+
+    # ── char count / failures ──────────────────────────────────────────────
+    meta_pills = [_pill(f"{len(results['full_text']):,} characters")]
+    failed_pages = results.get("failed_pages")
+    if failed_pages:
+        meta_pills.append(Span(f"⚠ {len(failed_pages)} page(s) failed",
+                               cls="pill pill-danger"))
 
     # ── progress messages ──────────────────────────────────────────────────
     prog_section = []
     if results.get("progress_messages"):
         prog_section = [Div(
             H4("Processing log"),
-            Ul(*[Li(m, style="font-size:0.85rem;color:var(--text-muted);padding:0.15rem 0;")
-                 for m in results["progress_messages"]],
-               style="list-style:none;padding:0;"),
-            style="background:var(--surface-alt);border:1px solid var(--border);border-radius:var(--radius);padding:0.75rem;margin-bottom:0.75rem;",
+            Ul(NotStr("".join(f"<li>{html_escape(m)}</li>"
+                              for m in results["progress_messages"])),
+               cls="ocr-log"),
+            cls="ocr-panel",
         )]
 
     return Div(
@@ -784,44 +837,25 @@ def ocr_result_display(results, file_hash, start_page, end_page, text_filename):
         # page-by-page
         Div(
             H4("Per-page detail"),
-            Ul(*page_items, cls="page-detail-list"),
-            style="background:var(--surface-alt);border:1px solid var(--border);border-radius:var(--radius);padding:0.75rem;margin-bottom:0.75rem;",
+            Ul(page_items, cls="page-detail-list"),
+            cls="ocr-panel",
         ),
 
         # char count / failures
-        Div(
-            Span(f"{len(results['full_text']):,} characters",
-                 cls="pill"),
-            *([Span(f"⚠ {len(results.get('failed_pages',[]))} page(s) failed",
-                    cls="pill",
-                    style="border-color:var(--red);color:var(--red);")]
-              if results.get("failed_pages") else []),
-            cls="file-meta",
-            style="margin-bottom:0.75rem;",
-        ),
+        Div(*meta_pills, cls="file-meta spaced"),
 
         # action buttons
         Div(
             A("⬇ Download Text",
               href=f"/{text_filename}",
               download=text_filename,
-              cls="button",
-              style="background:var(--green);"),
-            Button(
-                "📋 Copy",
-                onclick=(
-                    f"const t=document.getElementById('{preview_id}').textContent;"
-                    f"navigator.clipboard.writeText(t).then(()=>{{"
-                    f"this.textContent='✅ Copied!';this.style.background='var(--green)';"
-                    f"setTimeout(()=>{{this.textContent='📋 Copy';this.style.background='';}},2000);}});"
-                ),
-                cls="button",
-            ),
+              cls="button btn-green"),
+            copy_file_button(text_filename),
             cls="action-row",
         ),
 
         H4("Preview"),
-        Pre(results["full_text"],
+        Pre(*preview_text(results["full_text"], text_filename),
             id=preview_id,
             cls="text-preview"),
 
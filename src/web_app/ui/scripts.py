@@ -0,0 +1,41 @@
+"""Client-side behaviour for the web application.
+
+One delegated click listener handles every button that carries a
+`data-action` attribute, so rendered fragments only need data-* attributes.
+"""
+
+APP_JS = """
+document.addEventListener('click', e => {
+  const btn = e.target.closest('[data-action]');
+  if (!btn) return;
+  const d = btn.dataset;
+
+  switch (d.action) {
+    /* Copy a saved text file. The fetch is handed to ClipboardItem as a
+       pending blob so the copy stays tied to the click (Safari) and the text
+       never becomes a JS string; writeText is the fallback. */
+    case 'copy-file': {
+      const blob = fetch(d.url).then(r => r.blob())
+        .then(b => b.slice(0, b.size, 'text/plain'));
+      (window.ClipboardItem
+        ? navigator.clipboard.write([new ClipboardItem({'text/plain': blob})])
+        : blob.then(b => b.text()).then(t => navigator.clipboard.writeText(t)))
+        .then(() => {
+          btn.textContent = '✅ Copied!';
+          btn.style.background = 'var(--green)';
+          setTimeout(() => { btn.textContent = '📋 Copy'; btn.style.background = ''; }, 2000);
+        });
+      break;
+    }
+
+    /* Select / deselect every chapter checkbox in the enclosing form */
+    case 'toggle-chapters': {
+      const cbs = btn.closest('form').querySelectorAll('.ch-cb');
+      const allChecked = [...cbs].every(c => c.checked);
+      cbs.forEach(c => c.checked = !allChecked);
+      btn.textContent = allChecked ? 'Select All' : 'Deselect All';
+      break;
+    }
+  }
+});
+"""
@@ -1,6 +1,8 @@
 """CSS styles for the web application - mobile-first responsive design."""
 
-CSS_STYLES = """
+import re
+
+_CSS_SOURCE = """
 /* ── Reset & Base ─────────────────────────────────────────── */
 *, *::before, *::after { box-sizing: border-box; margin: 0; padding: 0; }
 
@@ -182,6 +184,7 @@ main > h1, main.container > h1 {
   gap: 0.4rem;
   margin-bottom: 0.5rem;
 }
+.file-meta.spaced { margin-bottom: 0.75rem; }
 
 .pill {
   display: inline-flex;
@@ -258,6 +261,10 @@ button, .button {
 }
 button:hover, .button:hover { background: var(--primary-hover); }
 button:active, .button:active { transform: translateY(1px); }
+/* Colour variants (also override the default hover colour) */
+.btn-green,  .btn-green:hover  { background: var(--green); }
+.btn-purple, .btn-purple:hover { background: var(--purple); }
+.btn-orange, .btn-orange:hover { background: var(--orange); }
 
 /* ── Result area ──────────────────────────────────────────── */
 .result-area {
@@ -292,6 +299,8 @@ tbody tr:hover { background: var(--surface-alt); }
              padding: 0.375rem 0; border-bottom: 1px solid var(--border);
              font-size: 0.875rem; gap: 0.5rem; }
 .toc-item:last-child { border-bottom: none; }
+/* Skip layout/paint for off-screen rows of long TOCs */
+.toc-item  { content-visibility: auto; contain-intrinsic-size: auto 2rem; }
 .toc-title { flex: 1; }
 .toc-page  { color: var(--text-muted); font-size: 0.78rem; white-space: nowrap; }
 .toc-l0    { font-weight: 700; }
@@ -314,6 +323,9 @@ tbody tr:hover { background: var(--surface-alt); }
   grid-template-columns: repeat(2, 1fr);
   gap: 0.6rem;
   margin-bottom: 0.75rem;
+  /* Off-screen page grids skip layout/paint until scrolled near */
+  content-visibility: auto;
+  contain-intrinsic-size: auto 20rem;
 }
 @media (min-width: 540px) { .image-extraction-grid { grid-template-columns: repeat(3, 1fr); } }
 @media (min-width: 900px) { .image-extraction-grid { grid-template-columns: repeat(4, 1fr); } }
@@ -419,6 +431,20 @@ h4 { font-size: 0.8rem; font-weight: 600; margin-bottom: 0.5rem; color: var(--te
 /* ── Page-detail list (OCR) ───────────────────────────────── */
 .page-detail-list { list-style: none; padding: 0; max-height: 200px; overflow-y: auto; }
 .page-detail-list li { padding: 0.2rem 0; font-size: 0.85rem; }
+.pd-cached   { color: #17a2b8; }
+.pd-llm      { color: #16a34a; }
+.pd-fallback { color: #ea580c; }
+.pd-failed   { color: #dc2626; }
+
+.ocr-panel {
+  background: var(--surface-alt);
+  border: 1px solid var(--border);
+  border-radius: var(--radius);
+  padding: 0.75rem;
+  margin-bottom: 0.75rem;
+}
+.ocr-log    { list-style: none; padding: 0; }
+.ocr-log li { font-size: 0.85rem; color: var(--text-muted); padding: 0.15rem 0; }
 
 /* ── HTMX loading indicators ──────────────────────────────── */
 /* Elements used as hx-indicator are hidden until HTMX adds
@@ -495,6 +521,21 @@ h4 { font-size: 0.8rem; font-weight: 600; margin-bottom: 0.5rem; color: var(--te
   text-overflow: ellipsis;
 }
 
+/* ── Chapter picker rows ──────────────────────────────────── */
+.ch-row   { display: flex; gap: .5rem; align-items: center; padding: .35rem 0; cursor: pointer; }
+.ch-cb    { width: 1.1rem; height: 1.1rem; cursor: pointer; }
+.ch-index { font-weight: 600; min-width: 1.5rem; }
+.ch-title { flex: 1; }
+.ch-toolbar { margin-bottom: .5rem; }
+.ch-list   { display: flex; flex-direction: column; }
+.ch-submit { margin-top: .75rem; }
+.ch-results { margin: .75rem 0; }
+.ch-results li { font-size: .85rem; }
+.btn-small { font-size: .78rem; padding: .3rem .7rem; }
+.muted-note { font-size: .82rem; color: var(--text-muted); }
+.gallery-hint { font-size: .8rem; margin-bottom: .5rem; }
+.pill.pill-danger { border-color: var(--red); color: var(--red); }
+
 /* ── Convert-images small gallery ─────────────────────────── */
 .image-gallery {
   display: grid;
@@ -504,3 +545,14 @@ h4 { font-size: 0.8rem; font-weight: 600; margin-bottom: 0.5rem; color: var(--te
 }
 .image-thumb { width: 100%; height: auto; border: 1px solid var(--border); border-radius: var(--radius); display: block; }
 """
+
+
+def _minify_css(css: str) -> str:
+    """Strip comments and insignificant whitespace (done once at import)."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+CSS_STYLES = _minify_css(_CSS_SOURCE)